@@ -0,0 +1,118 @@
+import heapq
+from collections import deque
+
+from dataStructures import MaxSegmentTree
+
+OVERLOAD_MODES = ("hold", "reject", "shed")
+
+
+class TokenBucket:
+    # Token bucket on simulated time: `rate` tokens accrue per tick up to
+    # `burst`, and every dispatched task spends one
+    def __init__(self, rate, burst=None):
+        self.rate = rate
+        self.burst = burst if burst is not None else max(rate, 1)
+        self.tokens = self.burst
+        self.last_refill = 0
+
+    def refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def take(self):
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+
+class AdmissionControl:
+    # Gate between the central queue and the dispatch policy, used by
+    # LoadBalancer.distribute_tasks. A queued task is only dispatched when
+    # some processor has room for its whole load (and, with a token bucket,
+    # a token is left). It goes where the policy selects if that processor
+    # has room, and otherwise to the first processor that does, so work is
+    # never piled onto a full processor. Tasks go in FIFO order and the first
+    # one that can't go holds back the rest. Tasks that can't be dispatched
+    # are handled according to `overload`:
+    #   hold   - wait in the central queue; arrivals beyond queue_limit are rejected
+    #   reject - rejected straight away
+    #   shed   - wait in the central queue; beyond queue_limit the lowest-priority
+    #            (then newest) waiting tasks are dropped
+    def __init__(self, balancer, overload="hold", queue_limit=None, rate=None, burst=None):
+        if overload not in OVERLOAD_MODES:
+            raise ValueError(f"overload must be one of {OVERLOAD_MODES}")
+        self.balancer = balancer
+        self.overload = overload
+        self.queue_limit = queue_limit  # Most tasks waiting centrally, None for no bound
+        self.bucket = TokenBucket(rate, burst) if rate is not None else None
+        self.dispatched = 0
+        self.rejected = 0
+        self.shed = 0
+        self.total_queue_ticks = 0  # Sum of dispatch - arrival over dispatched tasks
+        self.rebuild()
+
+    def rebuild(self):
+        processors = self.balancer.processors
+        self.capacity_tree = MaxSegmentTree(p.get_available_capacity() for p in processors)
+        # A task bigger than every processor still goes once one is empty
+        self.largest_capacity = max((p.capacity for p in processors), default=0)
+
+    def on_load_change(self, processor):
+        if processor.id < len(self.capacity_tree):
+            self.capacity_tree.update(processor.id, processor.get_available_capacity())
+
+    def _room_needed(self, task):
+        return min(task.load, self.largest_capacity)
+
+    def has_room(self, task):
+        return self.capacity_tree.max() >= self._room_needed(task)
+
+    def dispatch(self, tasks):
+        # Assign whatever may go now and return the tasks left waiting, oldest first
+        balancer = self.balancer
+        if self.bucket is not None:
+            self.bucket.refill(balancer.clock)
+        waiting = deque(tasks)
+        while waiting:
+            task = waiting[0]
+            if not self.has_room(task) or (self.bucket is not None and not self.bucket.take()):
+                break
+            waiting.popleft()
+            processor = balancer.policy.select(task)
+            needed = self._room_needed(task)
+            if processor.get_available_capacity() < needed:
+                processor = balancer.processors[self.capacity_tree.first_at_least(needed)]
+            processor.add_task(task)
+            balancer.policy.on_assign(processor, task)
+            self.dispatched += 1
+            self.total_queue_ticks += balancer.clock - task.arrival_time
+        return self._overflow(waiting)
+
+    def _overflow(self, waiting):
+        if self.overload == "reject":
+            dropped, waiting = waiting, deque()
+            self.rejected += len(dropped)
+        elif self.queue_limit is None or len(waiting) <= self.queue_limit:
+            return waiting
+        elif self.overload == "hold":
+            dropped = [waiting.pop() for _ in range(len(waiting) - self.queue_limit)]
+            self.rejected += len(dropped)
+        else:
+            dropped = heapq.nsmallest(len(waiting) - self.queue_limit, waiting,
+                                      key=lambda task: (task.priority, -task.arrival_time, -task.id))
+            shed_ids = {task.id for task in dropped}
+            waiting = deque(task for task in waiting if task.id not in shed_ids)
+            self.shed += len(dropped)
+        for task in dropped:
+            self.balancer.tasks_by_id.pop(task.id, None)
+            self.balancer.release_task(task)
+        return waiting
+
+    def stats(self):
+        stats = {"queued": self.balancer.task_queue.qsize(), "rejected": self.rejected}
+        if self.overload == "shed":
+            stats["shed"] = self.shed
+        if self.dispatched:
+            stats["mean_queue_ticks"] = self.total_queue_ticks / self.dispatched
+        return stats
@@ -0,0 +1,201 @@
+import numpy as np
+
+from policies import StrideScheduler
+
+ALGORITHMS = ("round_robin", "first_fit", "least_loaded", "weighted", "smooth_weighted", "adaptive")
+HISTORY_LENGTH = 100  # Same depth as Processor.history
+ADAPTIVE_WINDOW = 10  # Samples the adaptive policy averages over
+
+
+class ArrayLoadBalancer:
+    # Struct-of-arrays counterpart to LoadBalancer for large headless runs.
+    # Processor state lives in arrays indexed by processor id and in-flight
+    # tasks are packed densely into arrays indexed by slot, so a processing
+    # cycle is a handful of vectorized operations instead of a Python loop
+    # over every Processor and Task. It has the same step()/stats surface as
+    # LoadBalancer so HeadlessSimulation can drive either one.
+    def __init__(self, num_processors=4, capacity=100, processing_speed=1.0, task_capacity=1024):
+        # Processor state
+        self.capacity = np.full(num_processors, capacity, dtype=np.float64)
+        self.speed = np.full(num_processors, processing_speed, dtype=np.float64)
+        self.load = np.zeros(num_processors, dtype=np.float64)
+        self.task_count = np.zeros(num_processors, dtype=np.int64)
+        self.history = np.zeros((num_processors, HISTORY_LENGTH), dtype=np.float32)
+        self.history_samples = 0
+
+        # In-flight task state, slots [0, num_tasks) are live
+        self.num_tasks = 0
+        self.task_ids = np.zeros(task_capacity, dtype=np.int64)
+        self.task_load = np.zeros(task_capacity, dtype=np.float64)
+        self.remaining = np.zeros(task_capacity, dtype=np.float64)
+        self.arrival = np.zeros(task_capacity, dtype=np.int64)
+        self.task_processor = np.zeros(task_capacity, dtype=np.int32)
+
+        # Submitted but not yet distributed: (ids, loads, execution times, arrivals)
+        self.pending = []
+
+        self.completed_tasks = 0
+        self.total_response_ticks = 0
+        self.task_id_counter = 0
+        self._algorithm = "round_robin"
+        self.clock = 0
+        self._rr_cursor = 0
+        self._swrr = None  # StrideScheduler for smooth_weighted
+        self._swrr_speeds = None  # Speeds the scheduler's weights were taken from
+
+    @property
+    def algorithm(self):
+        return self._algorithm
+
+    @algorithm.setter
+    def algorithm(self, name):
+        if name not in ALGORITHMS:
+            raise ValueError(f"the array backend does not support {name!r}")
+        self._algorithm = name
+
+    @property
+    def num_processors(self):
+        return len(self.load)
+
+    def get_loads(self):
+        return self.load
+
+    def get_running_loads(self):
+        return self.load  # No local queues: every assigned task runs
+
+    def get_queue_lengths(self):
+        return np.zeros(len(self.load), dtype=np.int64)
+
+    def extra_stats(self):
+        return {}
+
+    def tasks_in_flight(self):
+        return self.num_tasks + sum(len(ids) for ids, _, _, _ in self.pending)
+
+    def add_task(self, load, execution_time):
+        self.add_tasks([load], [execution_time])
+
+    def add_tasks(self, loads, execution_times):
+        loads = np.asarray(loads, dtype=np.float64)
+        execution_times = np.asarray(execution_times, dtype=np.float64)
+        ids = np.arange(self.task_id_counter, self.task_id_counter + len(loads))
+        self.task_id_counter += len(loads)
+        arrivals = np.full(len(loads), self.clock, dtype=np.int64)
+        self.pending.append((ids, loads, execution_times, arrivals))
+
+    def _reserve(self, extra):
+        # Grow the task arrays geometrically so appends stay amortized O(1)
+        needed = self.num_tasks + extra
+        size = len(self.task_load)
+        if needed <= size:
+            return
+        while size < needed:
+            size *= 2
+        for name in ("task_ids", "task_load", "remaining", "arrival", "task_processor"):
+            old = getattr(self, name)
+            new = np.zeros(size, dtype=old.dtype)
+            new[:self.num_tasks] = old[:self.num_tasks]
+            setattr(self, name, new)
+
+    def place_tasks(self, ids, loads, execution_times, arrivals, processor_ids):
+        # Append already-assigned tasks and update per-processor totals in bulk
+        count = len(loads)
+        self._reserve(count)
+        start, end = self.num_tasks, self.num_tasks + count
+        self.task_ids[start:end] = ids
+        self.task_load[start:end] = loads
+        self.remaining[start:end] = execution_times
+        self.arrival[start:end] = arrivals
+        self.task_processor[start:end] = processor_ids
+        self.num_tasks = end
+        self.load += np.bincount(processor_ids, weights=loads, minlength=self.num_processors)
+        self.task_count += np.bincount(processor_ids, minlength=self.num_processors)
+
+    def _select(self, load, recent_load):
+        # Same decisions as the LoadBalancer policies, as array reductions
+        if self.algorithm == "round_robin":
+            self._rr_cursor %= self.num_processors
+            target = self._rr_cursor
+            self._rr_cursor += 1
+            return target
+        if self.algorithm == "smooth_weighted":
+            return self._swrr.next()
+        if self.algorithm == "first_fit":
+            fits = np.flatnonzero(self.capacity - self.load >= load)
+            return fits[0] if len(fits) else 0
+        if self.algorithm == "weighted":
+            return np.argmin(self.load / self.speed)
+        if self.algorithm == "adaptive":
+            scores = (self.load / self.capacity) * (1 / self.speed) * (1 + recent_load / 200)
+            return np.argmin(scores)
+        return np.argmin(self.load)
+
+    def _recent_load(self):
+        # Mean of the last ADAPTIVE_WINDOW history samples per processor
+        window = min(self.history_samples, ADAPTIVE_WINDOW)
+        if not window:
+            return np.zeros(self.num_processors)
+        cursor = self.history_samples % HISTORY_LENGTH
+        columns = np.arange(cursor - window, cursor) % HISTORY_LENGTH
+        return self.history[:, columns].mean(axis=1)
+
+    def distribute_tasks(self):
+        if not self.pending or not self.num_processors:
+            return
+        ids, loads, execution_times, arrivals = (np.concatenate(parts) for parts in zip(*self.pending))
+        self.pending = []
+
+        # Decisions depend on the load left by earlier tasks in the batch, so
+        # select one at a time but apply them to the task arrays in one go
+        recent_load = self._recent_load() if self.algorithm == "adaptive" else None
+        if self.algorithm == "smooth_weighted":
+            # Speeds are plain array writes here, so detect changes per batch
+            # and only re-weight the processors whose speed moved
+            if self._swrr is None:
+                self._swrr = StrideScheduler(self.speed.tolist())
+            else:
+                for i in np.flatnonzero(self._swrr_speeds != self.speed).tolist():
+                    self._swrr.set_weight(i, self.speed[i])
+            self._swrr_speeds = self.speed.copy()
+        processor_ids = np.empty(len(loads), dtype=np.int32)
+        for i, load in enumerate(loads):
+            target = self._select(load, recent_load)
+            processor_ids[i] = target
+            self.load[target] += load
+        self.load -= np.bincount(processor_ids, weights=loads, minlength=self.num_processors)
+        self.place_tasks(ids, loads, execution_times, arrivals, processor_ids)
+
+    def process_cycle(self):
+        n = self.num_tasks
+        processors = self.task_processor[:n]
+        remaining = self.remaining[:n]
+        remaining -= self.speed[processors]
+        done = remaining <= 0
+
+        self.clock += 1
+        completed = int(np.count_nonzero(done))
+        if completed:
+            done_processors = processors[done]
+            self.load -= np.bincount(done_processors, weights=self.task_load[:n][done],
+                                     minlength=self.num_processors)
+            self.task_count -= np.bincount(done_processors, minlength=self.num_processors)
+            self.total_response_ticks += int((self.clock - self.arrival[:n][done]).sum())
+
+            # Compact the surviving tasks to the front of the arrays
+            keep = ~done
+            survivors = n - completed
+            for name in ("task_ids", "task_load", "remaining", "arrival", "task_processor"):
+                array = getattr(self, name)
+                array[:survivors] = array[:n][keep]
+            self.num_tasks = survivors
+            self.completed_tasks += completed
+
+        self.history[:, self.history_samples % HISTORY_LENGTH] = self.load
+        self.history_samples += 1
+        return completed
+
+    def step(self, new_tasks=()):
+        for load, exec_time, *_ in new_tasks:  # Task keys are not used here
+            self.add_task(load, exec_time)
+        self.distribute_tasks()
+        return self.process_cycle()
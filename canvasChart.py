@@ -0,0 +1,91 @@
+import tkinter as tk
+
+import numpy as np
+
+# matplotlib's default "tab10" cycle, so both chart backends color series alike
+SERIES_COLORS = ["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd",
+                 "#8c564b", "#e377c2", "#7f7f7f", "#bcbd22", "#17becf"]
+
+
+class CanvasLineChart(tk.Canvas):
+    # Live line chart drawn with plain Tk canvas items, for the load history
+    # without going through matplotlib. Axes, grid and legend are drawn once
+    # per resize or series change; each update only moves every series'
+    # polyline with coords(). X is the sample index (0..depth-1), Y is
+    # clipped to [0, y_max].
+    MARGIN_LEFT = 45
+    MARGIN_RIGHT = 10
+    MARGIN_TOP = 10
+    MARGIN_BOTTOM = 30
+
+    def __init__(self, master, depth=100, y_max=110, y_step=20, **options):
+        options.setdefault("bg", "white")
+        options.setdefault("highlightthickness", 0)
+        super().__init__(master, **options)
+        self.depth = depth
+        self.y_max = y_max
+        self.y_step = y_step
+        self.labels = []
+        self.colors = []
+        self.lines = []  # Canvas item id per series
+        self.histories = []  # Last data drawn, replayed after a resize
+        self.plot_box = (0, 0, 1, 1)
+        self._xs = np.zeros(depth)
+        self.bind("<Configure>", self._on_resize)
+
+    def set_series(self, labels, colors=None):
+        self.labels = list(labels)
+        self.colors = list(colors) if colors else [SERIES_COLORS[i % len(SERIES_COLORS)]
+                                                    for i in range(len(self.labels))]
+        self.histories = []
+        self._redraw()
+
+    def _on_resize(self, event):
+        self._redraw()
+
+    def _redraw(self):
+        # Everything except the data: axes, grid, labels, legend, empty lines
+        self.delete("all")
+        width, height = self.winfo_width(), self.winfo_height()
+        left, top = self.MARGIN_LEFT, self.MARGIN_TOP
+        right = max(left + 1, width - self.MARGIN_RIGHT)
+        bottom = max(top + 1, height - self.MARGIN_BOTTOM)
+        self.plot_box = (left, top, right, bottom)
+        self._xs = left + np.arange(self.depth) * ((right - left) / max(self.depth - 1, 1))
+
+        for value in range(0, int(self.y_max) + 1, self.y_step):
+            y = self._y(value)
+            self.create_line(left, y, right, y, fill="#d0d0d0", dash=(4, 4))
+            self.create_text(left - 5, y, text=str(value), anchor=tk.E, font=("Arial", 8))
+        self.create_rectangle(left, top, right, bottom, outline="black")
+        self.create_text(12, (top + bottom) / 2, text="Load (%)", angle=90, font=("Arial", 9))
+        self.create_text((left + right) / 2, height - 10, text="Time", font=("Arial", 9))
+
+        self.lines = [self.create_line(0, 0, 0, 0, fill=color, width=2, state=tk.HIDDEN)
+                      for color in self.colors]
+        for i, (label, color) in enumerate(zip(self.labels, self.colors)):
+            y = top + 10 + i * 14
+            self.create_line(right - 110, y, right - 90, y, fill=color, width=2)
+            self.create_text(right - 85, y, text=label, anchor=tk.W, font=("Arial", 8))
+        if self.histories:
+            self.update_series(self.histories)
+
+    def _y(self, value):
+        _, top, _, bottom = self.plot_box
+        return bottom - (bottom - top) * value / self.y_max
+
+    def update_series(self, histories):
+        # One sequence of samples per series, oldest first
+        self.histories = histories
+        _, top, _, bottom = self.plot_box
+        scale = (bottom - top) / self.y_max
+        for line, history in zip(self.lines, histories):
+            count = min(len(history), self.depth)
+            if count < 2:
+                self.itemconfig(line, state=tk.HIDDEN)
+                continue
+            points = np.empty(2 * count)
+            points[0::2] = self._xs[:count]
+            points[1::2] = bottom - np.clip(history[len(history) - count:], 0, self.y_max) * scale
+            self.coords(line, *points.tolist())
+            self.itemconfig(line, state=tk.NORMAL)
@@ -0,0 +1,173 @@
+import numpy as np
+
+
+class IndexedMinHeap:
+    # Binary min-heap that remembers where each item sits, so an item's
+    # priority can be changed or the item removed in O(log n) instead of
+    # rebuilding or re-sorting. Ties are broken by the item itself, which
+    # keeps the order identical to a stable sort over processor ids.
+    def __init__(self):
+        self._heap = []  # (priority, item) pairs
+        self._pos = {}  # item -> index in _heap
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __contains__(self, item):
+        return item in self._pos
+
+    def peek(self):
+        return self._heap[0][1] if self._heap else None
+
+    def priority(self, item):
+        return self._heap[self._pos[item]][0]
+
+    def push(self, item, priority):
+        if item in self._pos:
+            self.update(item, priority)
+            return
+        self._heap.append((priority, item))
+        self._pos[item] = len(self._heap) - 1
+        self._sift_up(len(self._heap) - 1)
+
+    def update(self, item, priority):
+        index = self._pos[item]
+        old = self._heap[index][0]
+        self._heap[index] = (priority, item)
+        if priority < old:
+            self._sift_up(index)
+        else:
+            self._sift_down(index)
+
+    def remove(self, item):
+        index = self._pos.pop(item)
+        last = self._heap.pop()
+        if index < len(self._heap):
+            self._heap[index] = last
+            self._pos[last[1]] = index
+            self._sift_up(index)
+            self._sift_down(self._pos[last[1]])
+
+    def pop(self):
+        item = self.peek()
+        if item is not None:
+            self.remove(item)
+        return item
+
+    def _swap(self, i, j):
+        heap = self._heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self._pos[heap[i][1]] = i
+        self._pos[heap[j][1]] = j
+
+    def _sift_up(self, index):
+        heap = self._heap
+        while index > 0:
+            parent = (index - 1) // 2
+            if heap[index] < heap[parent]:
+                self._swap(index, parent)
+                index = parent
+            else:
+                break
+
+    def _sift_down(self, index):
+        heap = self._heap
+        size = len(heap)
+        while True:
+            smallest = index
+            for child in (2 * index + 1, 2 * index + 2):
+                if child < size and heap[child] < heap[smallest]:
+                    smallest = child
+            if smallest == index:
+                break
+            self._swap(index, smallest)
+            index = smallest
+
+
+class MaxSegmentTree:
+    # Segment tree over a fixed number of slots that keeps the maximum of
+    # each range, so "first slot whose value is at least x" is answered in
+    # O(log n) by descending into the leftmost child that can satisfy it.
+    def __init__(self, values=()):
+        values = list(values)
+        self.size = len(values)
+        self._leaves = 1
+        while self._leaves < max(self.size, 1):
+            self._leaves *= 2
+        self._tree = [float("-inf")] * (2 * self._leaves)
+        self._tree[self._leaves:self._leaves + self.size] = values
+        for node in range(self._leaves - 1, 0, -1):
+            self._tree[node] = max(self._tree[2 * node], self._tree[2 * node + 1])
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        return self._tree[self._leaves + index]
+
+    def update(self, index, value):
+        node = self._leaves + index
+        self._tree[node] = value
+        node //= 2
+        while node:
+            best = max(self._tree[2 * node], self._tree[2 * node + 1])
+            if self._tree[node] == best:
+                break  # Ancestors are unchanged too
+            self._tree[node] = best
+            node //= 2
+
+    def max(self):
+        return self._tree[1]
+
+    def first_at_least(self, value):
+        # Leftmost index holding a value >= value, or None
+        if self.size == 0 or self._tree[1] < value:
+            return None
+        node = 1
+        while node < self._leaves:
+            node *= 2
+            if self._tree[node] < value:
+                node += 1
+        return node - self._leaves
+
+
+class RingBuffer:
+    # Fixed-size circular buffer backed by a preallocated NumPy array.
+    # Every sample is written twice, at i and i + capacity, so the most recent
+    # samples are always one contiguous slice and view() never copies.
+    def __init__(self, capacity=100, dtype=np.float32):
+        self.capacity = capacity
+        self._data = np.zeros(2 * capacity, dtype=dtype)
+        self._cursor = 0  # Next write position in [0, capacity)
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def append(self, value):
+        cursor = self._cursor
+        self._data[cursor] = value
+        self._data[cursor + self.capacity] = value
+        self._cursor = (cursor + 1) % self.capacity
+        if self._count < self.capacity:
+            self._count += 1
+
+    def view(self, n=None):
+        # Last n samples (all by default), oldest first, as a read-only view
+        n = self._count if n is None else min(n, self._count)
+        end = self._cursor + self.capacity
+        window = self._data[end - n:end]
+        window.flags.writeable = False
+        return window
+
+    def __getitem__(self, index):
+        # Integer indexing like a list, newest at -1; returns a plain Python number
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("ring buffer index out of range")
+        return self._data[self._cursor + self.capacity - self._count + index].item()
+
+    def clear(self):
+        self._cursor = 0
+        self._count = 0
@@ -0,0 +1,524 @@
+import threading
+import time
+from collections import deque
+
+from admissionControl import AdmissionControl
+from dataStructures import RingBuffer
+from policies import create_policy
+from rebalancer import Rebalancer
+from workStealing import WorkStealing
+
+RECENT_WINDOW = 10  # History samples the adaptive policy averages over
+# Local queueing disciplines. None runs every task at full speed regardless of
+# capacity; fcfs and srpt run the tasks that fit in capacity (in arrival or
+# shortest-remaining order) while the rest wait; ps runs everything but slows
+# all tasks down in proportion when the processor is overloaded.
+DISCIPLINES = (None, "fcfs", "ps", "srpt")
+
+class Processor:
+    __slots__ = ("id", "capacity", "speed_listeners", "_processing_speed", "current_load",
+                 "tasks", "history", "recent_load_sum", "load_listeners", "discipline", "_run_order",
+                 "_running")
+    
+    def __init__(self, id, capacity=100, processing_speed=1.0, history_depth=100, discipline=None):
+        if discipline not in DISCIPLINES:
+            raise ValueError(f"discipline must be one of {DISCIPLINES}")
+        self.id = id
+        self.capacity = capacity  # Maximum load capacity
+        self.speed_listeners = []  # Called with the processor whenever processing_speed changes
+        self.processing_speed = processing_speed  # Speed multiplier
+        self.current_load = 0  # Current load (0-100%)
+        self.tasks = []  # Tasks currently assigned; each task knows its slot in this list
+        self.history = RingBuffer(history_depth)  # Recent load values for plotting
+        self.recent_load_sum = 0  # Running sum of the last RECENT_WINDOW history samples
+        self.load_listeners = []  # Called with (processor, task, added) when a task is added or removed
+        self.discipline = discipline  # Local queueing discipline, see DISCIPLINES
+        self._run_order = None  # Tasks sorted for fcfs/srpt, rebuilt after adds and removes
+        self._running = None  # Leading part of _run_order that fits in capacity
+        
+    def add_task(self, task):
+        task.slot = len(self.tasks)
+        self.tasks.append(task)
+        self._run_order = self._running = None
+        task.processor = self
+        self.current_load += task.load
+        self._notify_load_change(task, True)
+        
+    def has_task(self, task):
+        slot = task.slot
+        return task.processor is self and slot < len(self.tasks) and self.tasks[slot] is task
+        
+    def remove_task(self, task):
+        # Swap-remove: move the last task into the freed slot, O(1)
+        if self.has_task(task):
+            last = self.tasks.pop()
+            if last is not task:
+                self.tasks[task.slot] = last
+                last.slot = task.slot
+            self._run_order = self._running = None
+            self.current_load -= task.load
+            self._notify_load_change(task, False)
+            
+    def _notify_load_change(self, task, added):
+        for listener in self.load_listeners:
+            listener(self, task, added)
+            
+    @property
+    def processing_speed(self):
+        return self._processing_speed
+        
+    @processing_speed.setter
+    def processing_speed(self, value):
+        self._processing_speed = value
+        for listener in self.speed_listeners:
+            listener(self)
+            
+    def running_tasks(self):
+        # Tasks that make progress this cycle; the others wait in the local queue
+        if self.discipline not in ("fcfs", "srpt"):
+            return self.tasks
+        if self._running is not None:
+            return self._running
+        if self._run_order is None:
+            # Every running task advances by the same amount, so both orders
+            # stay valid until the task set changes
+            if self.discipline == "srpt":
+                self._run_order = sorted(self.tasks, key=lambda task: (task.remaining_time, task.id))
+            else:
+                self._run_order = sorted(self.tasks, key=lambda task: (task.arrival_time, task.id))
+        running = []
+        used = 0
+        for task in self._run_order:
+            # The head always runs, so a task larger than capacity can't block the queue
+            if running and used + task.load > self.capacity:
+                break
+            running.append(task)
+            used += task.load
+        self._running = running
+        return running
+
+    def running_load(self):
+        # Load actually being served, as opposed to current_load, which also
+        # counts tasks waiting in the local queue
+        if self.discipline in ("fcfs", "srpt"):
+            return sum(task.load for task in self.running_tasks())
+        if self.discipline == "ps":
+            return min(self.current_load, self.capacity)
+        return self.current_load
+
+    def queue_length(self):
+        # Tasks waiting in the local queue
+        return len(self.tasks) - len(self.running_tasks())
+
+    def last_queued(self):
+        # The task at the back of the local queue: last in run order under
+        # fcfs/srpt, otherwise the last one assigned
+        if self.discipline in ("fcfs", "srpt"):
+            self.running_tasks()
+            return self._run_order[-1]
+        return self.tasks[-1]
+        
+    def process_tasks(self):
+        # Process tasks based on processing speed
+        speed = self.processing_speed
+        if self.discipline == "ps" and self.current_load > self.capacity:
+            speed *= self.capacity / self.current_load  # Overloaded: everyone slows down
+        completed_tasks = []
+        for task in self.running_tasks():
+            task.remaining_time -= speed
+            if task.remaining_time <= 0:
+                completed_tasks.append(task)
+                
+        # Remove completed tasks
+        for task in completed_tasks:
+            self.remove_task(task)
+        
+    # Update history
+        self.update_history()
+        
+        return completed_tasks
+
+    def update_history(self):
+        # Record history for plotting; the ring overwrites the oldest sample
+        window = min(RECENT_WINDOW, self.history.capacity)
+        if len(self.history) >= window:
+            self.recent_load_sum -= self.history[-window]
+        self.history.append(self.current_load)
+        self.recent_load_sum += self.history[-1]  # As stored, so the sum cancels exactly
+    
+    def get_available_capacity(self):
+        return self.capacity - self.current_load
+        
+    def get_recent_load(self):
+        # Mean of the last RECENT_WINDOW history samples
+        return self.recent_load_sum / max(min(len(self.history), RECENT_WINDOW), 1)
+
+class Task:
+    __slots__ = ("id", "load", "execution_time", "remaining_time", "processor", "slot",
+                 "arrival_time", "finish_time", "cancelled", "key", "priority")
+    
+    def __init__(self, id, load, execution_time, key=None, priority=0):
+        self.id = id
+        self.load = load  # CPU load (0-100%)
+        self.execution_time = execution_time  # Time to complete
+        self.remaining_time = execution_time  # Remaining time
+        self.processor = None  # Assigned processor
+        self.slot = 0  # Index in the assigned processor's task list
+        self.arrival_time = 0  # Simulated tick the task was submitted
+        self.finish_time = None  # Simulated tick the task completed
+        self.cancelled = False
+        self.key = key  # Optional affinity key (e.g. a cache key), used by key-aware policies
+        self.priority = priority  # Higher survives longer when admission control sheds load
+
+class TaskPool:
+    # Free list of finished Task objects, reinitialized instead of allocating
+    # a new one per submission so long runs don't churn the allocator and GC
+    def __init__(self):
+        self._free = []
+        self.created = 0  # Task objects ever allocated by the pool
+        
+    def acquire(self, id, load, execution_time, key=None, priority=0):
+        if self._free:
+            task = self._free.pop()
+            task.__init__(id, load, execution_time, key, priority)
+            return task
+        self.created += 1
+        return Task(id, load, execution_time, key, priority)
+        
+    def release(self, task):
+        task.processor = None
+        self._free.append(task)
+        
+    def __len__(self):
+        return len(self._free)
+
+class TaskBacklog:
+    # FIFO of submitted tasks waiting to be distributed. Unlike queue.Queue it
+    # takes and hands out whole batches under a single lock acquisition.
+    def __init__(self):
+        self._tasks = deque()
+        self._lock = threading.Lock()
+        
+    def put(self, task):
+        with self._lock:
+            self._tasks.append(task)
+            
+    def put_many(self, tasks):
+        with self._lock:
+            self._tasks.extend(tasks)
+            
+    def put_front(self, tasks):
+        # Return tasks that could not be dispatched, ahead of newer submissions
+        with self._lock:
+            self._tasks.extendleft(reversed(tasks))
+            
+    def drain(self):
+        # Take everything queued so far in one go
+        with self._lock:
+            tasks, self._tasks = self._tasks, deque()
+        return tasks
+        
+    def qsize(self):
+        return len(self._tasks)
+        
+    def empty(self):
+        return not self._tasks
+
+class Snapshot:
+    # Point-in-time copy of what the GUI draws, taken on the simulation thread
+    # so the Tk thread never reads processor state while it is being changed
+    __slots__ = ("clock", "loads", "capacities", "task_counts", "histories", "queued", "completed")
+    
+    def __init__(self, balancer):
+        processors = balancer.processors
+        self.clock = balancer.clock
+        self.loads = [p.current_load for p in processors]
+        self.capacities = [p.capacity for p in processors]
+        self.task_counts = [len(p.tasks) for p in processors]
+        self.histories = [p.history.view().copy() for p in processors]
+        self.queued = balancer.task_queue.qsize()
+        self.completed = balancer.completed_tasks
+
+class LoadBalancer:
+    def __init__(self, num_processors=4, history_depth=100, use_task_pool=False, discipline=None):
+        self.history_depth = history_depth  # Samples kept per processor
+        # Held for every tick; other threads (the GUI) take it to change
+        # processors, speeds or the policy so indexes never see a half-done tick
+        self.lock = threading.RLock()
+        self.discipline = discipline  # Local queueing discipline for every processor
+        # With pooling, completed tasks are recycled, so lists returned by
+        # process_cycle()/step() are only valid until the next cycle
+        self.task_pool = TaskPool() if use_task_pool else None
+        self._completed_last_cycle = []
+        self.processors = []
+        self.policy = None  # Active Policy instance, replaced when algorithm changes
+        self.work_stealing = None  # WorkStealing when pull-based balancing is on
+        self.admission = None  # AdmissionControl when the central queue is gated
+        self.rebalancer = None  # Rebalancer when tasks are periodically migrated
+        for i in range(num_processors):
+            self._attach(Processor(i, history_depth=history_depth, discipline=discipline))
+        self.task_queue = TaskBacklog()
+        self.tasks_by_id = {}  # Task id -> task, for every submitted, unfinished task
+        self.completed_tasks = 0
+        self.total_response_ticks = 0  # Sum of finish - arrival over completed tasks
+        self.task_id_counter = 0
+        self.algorithm = "round_robin"  # Default algorithm
+        self.running = False
+        self.paused = False
+        self.clock = 0  # Simulated time in ticks, independent of wall time
+        self.tick_interval = 0.1  # Wall-clock seconds per tick in real-time mode
+        
+    @property
+    def algorithm(self):
+        return self.policy.name
+        
+    @algorithm.setter
+    def algorithm(self, name):
+        if self.policy is None or self.policy.name != name:
+            self.set_algorithm(name)
+            
+    def set_algorithm(self, name, **options):
+        # Switch policy, passing any policy-specific options (e.g. d=3 for
+        # power_of_d). Only the newly selected policy builds its index.
+        with self.lock:
+            self.policy = create_policy(name, self, **options)
+        
+    def enable_work_stealing(self, **options):
+        # Idle/under-loaded processors steal queued work each cycle; see WorkStealing
+        self.work_stealing = WorkStealing(self, **options)
+        return self.work_stealing
+        
+    def disable_work_stealing(self):
+        self.work_stealing = None
+        
+    def enable_admission_control(self, **options):
+        # Hold, reject or shed tasks nobody has room for; see AdmissionControl
+        self.admission = AdmissionControl(self, **options)
+        return self.admission
+        
+    def disable_admission_control(self):
+        self.admission = None
+        
+    def enable_rebalancing(self, **options):
+        # Periodically migrate tasks from overloaded to underloaded processors; see Rebalancer
+        self.rebalancer = Rebalancer(self, **options)
+        return self.rebalancer
+        
+    def disable_rebalancing(self):
+        self.rebalancer = None
+        
+    def set_discipline(self, discipline):
+        # Change the local queueing discipline of every processor
+        if discipline not in DISCIPLINES:
+            raise ValueError(f"discipline must be one of {DISCIPLINES}")
+        self.discipline = discipline
+        for processor in self.processors:
+            processor.discipline = discipline
+            processor._run_order = processor._running = None
+        
+    def _attach(self, processor):
+        self.processors.append(processor)
+        processor.load_listeners.append(self._on_load_change)
+        processor.speed_listeners.append(self._on_speed_change)
+        
+    def _on_load_change(self, processor, task, added):
+        if added:
+            self.policy.on_add(processor, task)
+        else:
+            self.policy.on_remove(processor, task)
+        if self.work_stealing is not None:
+            self.work_stealing.on_load_change(processor)
+        if self.admission is not None:
+            self.admission.on_load_change(processor)
+            
+    def _on_speed_change(self, processor):
+        self.policy.on_speed_change(processor)
+        
+    def resize(self, num_processors):
+        # Add or remove processors; tasks on removed processors go back to the queue
+        with self.lock:
+            current_count = len(self.processors)
+            
+            if num_processors > current_count:
+                for i in range(current_count, num_processors):
+                    self._attach(Processor(i, history_depth=self.history_depth, discipline=self.discipline))
+            elif num_processors < current_count:
+                removed = self.processors[num_processors:]
+                self.processors = self.processors[:num_processors]
+                for processor in removed:
+                    processor.load_listeners.remove(self._on_load_change)
+                    processor.speed_listeners.remove(self._on_speed_change)
+                    for task in processor.tasks:
+                        task.processor = None
+                    self.task_queue.put_many(processor.tasks)
+            self.policy.rebuild()
+            if self.work_stealing is not None:
+                self.work_stealing.rebuild()
+            if self.admission is not None:
+                self.admission.rebuild()
+        
+    def _new_task(self, load, execution_time, key=None, priority=0):
+        if self.task_pool is not None:
+            task = self.task_pool.acquire(self.task_id_counter, load, execution_time, key, priority)
+        else:
+            task = Task(self.task_id_counter, load, execution_time, key, priority)
+        task.arrival_time = self.clock
+        self.task_id_counter += 1
+        self.tasks_by_id[task.id] = task
+        return task
+        
+    def add_task(self, load, execution_time, key=None, priority=0):
+        task = self._new_task(load, execution_time, key, priority)
+        self.task_queue.put(task)
+        return task
+        
+    def add_tasks(self, loads, execution_times, keys=None, priorities=None):
+        # Bulk submission: sequences or NumPy arrays, queued under one lock
+        if hasattr(loads, "tolist"):
+            loads = loads.tolist()
+        if hasattr(execution_times, "tolist"):
+            execution_times = execution_times.tolist()
+        if keys is None:
+            keys = [None] * len(loads)
+        elif hasattr(keys, "tolist"):
+            keys = keys.tolist()
+        if priorities is None:
+            priorities = [0] * len(loads)
+        elif hasattr(priorities, "tolist"):
+            priorities = priorities.tolist()
+        tasks = [self._new_task(load, execution_time, key, priority)
+                 for load, execution_time, key, priority in zip(loads, execution_times, keys, priorities)]
+        self.task_queue.put_many(tasks)
+        return tasks
+        
+    def find_task(self, task_id):
+        # O(1) lookup of an unfinished task; task.processor is None while queued
+        return self.tasks_by_id.get(task_id)
+        
+    def cancel_task(self, task_id):
+        # Drop a task wherever it is; queued tasks are skipped when distributed
+        task = self.tasks_by_id.pop(task_id, None)
+        if task is None:
+            return False
+        if task.processor is not None:
+            task.processor.remove_task(task)
+            task.cancelled = True
+            self.release_task(task)
+        else:
+            task.cancelled = True  # Released when distribute_tasks drops it
+        return True
+        
+    def release_task(self, task):
+        # Hand a finished or cancelled task back to the pool, if pooling
+        if self.task_pool is not None:
+            self.task_pool.release(task)
+        
+    def record_completion(self, task, finish_time):
+        # Bookkeeping for a task that has left its processor
+        self.policy.on_complete(task.processor, task)
+        task.finish_time = finish_time
+        self.total_response_ticks += finish_time - task.arrival_time
+        self.tasks_by_id.pop(task.id, None)
+        self.completed_tasks += 1
+        
+    def distribute_tasks(self):
+        # Hand the whole backlog to the active policy in one batch
+        tasks = []
+        for task in self.task_queue.drain():
+            if task.cancelled:
+                self.release_task(task)
+            else:
+                tasks.append(task)
+        if not tasks:
+            return
+        if not self.processors:
+            self.task_queue.put_many(tasks)  # Nowhere to run them yet
+            return
+        if self.admission is not None:
+            waiting = self.admission.dispatch(tasks)
+            if waiting:
+                self.task_queue.put_front(waiting)
+            return
+        self.policy.assign_batch(tasks)
+            
+    def process_cycle(self):
+        # Process one cycle of tasks on all processors
+        if self.task_pool is not None:
+            for task in self._completed_last_cycle:
+                self.task_pool.release(task)
+                
+        # Periodic global rebalancing, then let idle processors pull work
+        # before this cycle's processing
+        if self.rebalancer is not None:
+            self.rebalancer.maybe_run(self.clock)
+        if self.work_stealing is not None:
+            self.work_stealing.run()
+            
+        completed = []
+        for processor in self.processors:
+            # Make sure history is updated even if no tasks are processed
+            if not processor.tasks:
+                processor.update_history()
+            completed.extend(processor.process_tasks())
+            self.policy.on_history_update(processor)
+        
+        # Advance the simulated clock by one tick
+        self.clock += 1
+        for task in completed:
+            self.record_completion(task, self.clock)
+        
+        if self.task_pool is not None:
+            self._completed_last_cycle = completed
+        return completed
+        
+    def get_loads(self):
+        return [p.current_load for p in self.processors]
+
+    def get_running_loads(self):
+        # Utilisation: like get_loads, minus work waiting in local queues
+        return [p.running_load() for p in self.processors]
+
+    def get_queue_lengths(self):
+        return [p.queue_length() for p in self.processors]
+        
+    def extra_stats(self):
+        # Figures from the policy and the optional mechanisms, for simulation summaries
+        stats = dict(self.policy.stats())
+        if self.work_stealing is not None:
+            stats.update(self.work_stealing.stats())
+        if self.rebalancer is not None:
+            stats.update(self.rebalancer.stats())
+        if self.admission is not None:
+            stats.update(self.admission.stats())
+        return stats
+        
+    def snapshot(self):
+        with self.lock:
+            return Snapshot(self)
+        
+    def tasks_in_flight(self):
+        return self.task_queue.qsize() + sum(len(p.tasks) for p in self.processors)
+        
+    def step(self, new_tasks=()):
+        # Run one simulation tick: submit, distribute and process tasks.
+        # new_tasks holds (load, execution_time), optionally followed by key and priority.
+        with self.lock:
+            if new_tasks:
+                self.add_tasks(*zip(*new_tasks))
+            
+            # Distribute tasks from queue
+            self.distribute_tasks()
+            
+            # Process tasks on processors
+            return self.process_cycle()
+        
+    def run_simulation(self, task_generator, tick_callback):
+        # Real-time mode: one tick every tick_interval seconds. tick_callback
+        # runs on this thread after each tick, e.g. to publish a snapshot.
+        self.running = True
+        while self.running:
+            if not self.paused:
+                self.step(task_generator())
+                tick_callback()
+                
+            time.sleep(self.tick_interval)  # Simulation speed
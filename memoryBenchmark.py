@@ -0,0 +1,62 @@
+import argparse
+import tracemalloc
+
+from loadBalancer import LoadBalancer, Task
+from simEngine import HeadlessSimulation, make_task_generator
+
+
+class DictTask(Task):
+    # Same fields as Task but with a per-instance __dict__, for comparison
+    pass
+
+
+def bytes_per_object(cls, count):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [cls(i, 20, 5.0) for i in range(count)]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    # Subtract the list holding them (one pointer per object)
+    return (after - before) / count - 8, len(objects)
+
+
+def bytes_per_in_flight_task(count, num_processors=16):
+    # Everything a submitted, assigned task costs: the object, its slot in
+    # the processor's list and its entry in the task-id index
+    lb = LoadBalancer(num_processors)
+    lb.algorithm = "least_loaded"
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for _ in range(count):
+        lb.add_task(0.001, 1e9)
+    lb.distribute_tasks()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / count
+
+
+def allocation_churn(use_task_pool, ticks):
+    lb = LoadBalancer(16, use_task_pool=use_task_pool)
+    lb.algorithm = "least_loaded"
+    generator = make_task_generator(rate=10.0, seed=0)
+    results = HeadlessSimulation(lb, generator).run(ticks=ticks)
+    created = lb.task_pool.created if lb.task_pool else results.tasks_submitted
+    return results.tasks_submitted, created
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure memory used per in-flight task")
+    parser.add_argument("--tasks", type=int, default=200000)
+    parser.add_argument("--ticks", type=int, default=100000)
+    args = parser.parse_args()
+
+    slotted, _ = bytes_per_object(Task, args.tasks)
+    with_dict, _ = bytes_per_object(DictTask, args.tasks)
+    print(f"Task object (__slots__):  {slotted:.0f} bytes")
+    print(f"Task object (__dict__):   {with_dict:.0f} bytes")
+    print(f"In-flight task, total:    {bytes_per_in_flight_task(args.tasks):.0f} bytes")
+
+    for use_task_pool in (False, True):
+        submitted, created = allocation_churn(use_task_pool, args.ticks)
+        label = "pooled" if use_task_pool else "unpooled"
+        print(f"{label:>8}: {submitted} tasks submitted, {created} Task objects allocated")
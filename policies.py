@@ -0,0 +1,516 @@
+import random
+from array import array
+from bisect import bisect_left, bisect_right
+from hashlib import blake2b
+
+from dataStructures import IndexedMinHeap, MaxSegmentTree
+
+POLICIES = {}  # Policy name -> class, in registration order (the GUI lists them this way)
+
+
+def register_policy(cls):
+    POLICIES[cls.name] = cls
+    return cls
+
+
+def available_policies():
+    return list(POLICIES)
+
+
+def create_policy(name, balancer, **options):
+    if name not in POLICIES:
+        raise ValueError(f"unknown load balancing algorithm: {name!r}")
+    return POLICIES[name](balancer, **options)
+
+
+class Policy:
+    # Base class for dispatch policies. A policy owns whatever state it needs
+    # (cursors, heaps, trees) and keeps it current through the hooks below,
+    # which LoadBalancer calls as processors and tasks change. Policies are
+    # created when selected, so switching only builds the new policy's index.
+    # Subclasses that take options accept them as keyword arguments.
+    name = None
+    uses_history = False  # Reads processor load history, which only the tick engine records
+
+    def __init__(self, balancer):
+        self.balancer = balancer
+        self.rebuild()
+
+    @property
+    def processors(self):
+        return self.balancer.processors
+
+    def rebuild(self):
+        # Recompute all policy state from scratch (creation, resize)
+        pass
+
+    def select(self, task):
+        # Choose a processor for the task without placing it there
+        raise NotImplementedError
+
+    def assign(self, task):
+        # Place the task on the selected processor and return that processor
+        processor = self.select(task)
+        processor.add_task(task)
+        self.on_assign(processor, task)
+        return processor
+
+    def assign_batch(self, tasks):
+        # Decisions depend on the load left by earlier tasks, so by default
+        # tasks are placed one at a time
+        for task in tasks:
+            self.assign(task)
+
+    def on_add(self, processor, task):
+        self.on_load_change(processor)
+
+    def on_remove(self, processor, task):
+        self.on_load_change(processor)
+
+    def on_assign(self, processor, task):
+        # A dispatched task has been placed, possibly not where select() chose
+        # (admission control overrides choices that don't fit)
+        pass
+
+    def on_complete(self, processor, task):
+        pass
+
+    def on_load_change(self, processor):
+        pass
+
+    def on_speed_change(self, processor):
+        pass
+
+    def on_history_update(self, processor):
+        pass
+
+    def stats(self):
+        # Policy-specific figures for simulation summaries
+        return {}
+
+
+@register_policy
+class RoundRobinPolicy(Policy):
+    # Rotating cursor over the processors, O(1) and capacity-blind
+    name = "round_robin"
+
+    def rebuild(self):
+        self.cursor = 0
+
+    def select(self, task):
+        self.cursor %= len(self.processors)
+        processor = self.processors[self.cursor]
+        self.cursor += 1
+        return processor
+
+
+@register_policy
+class FirstFitPolicy(Policy):
+    # First processor (by id) with enough available capacity, found by
+    # descending a max segment tree of available capacity in O(log P)
+    name = "first_fit"
+
+    def rebuild(self):
+        self.capacity_tree = MaxSegmentTree(p.get_available_capacity() for p in self.processors)
+
+    def on_load_change(self, processor):
+        if processor.id < len(self.capacity_tree):
+            self.capacity_tree.update(processor.id, processor.get_available_capacity())
+
+    def select(self, task):
+        index = self.capacity_tree.first_at_least(task.load)
+        # If no processor has capacity, assign to the first one anyway
+        # (with admission control on, such tasks wait in the central queue)
+        return self.processors[index if index is not None else 0]
+
+
+class IndexedPolicy(Policy):
+    # Keeps processor ids in an IndexedMinHeap keyed by score(), updated in
+    # place on every relevant change, and assigns to the lowest score. Ties
+    # go to the lowest id, matching a stable sort over the processor list.
+    # The task is assigned there even if all processors are overloaded,
+    # unless admission control holds it back.
+    def score(self, processor):
+        raise NotImplementedError
+
+    def rebuild(self):
+        self.index = IndexedMinHeap()
+        for processor in self.processors:
+            self.index.push(processor.id, self.score(processor))
+
+    def refresh(self, processor):
+        if processor.id in self.index:
+            self.index.update(processor.id, self.score(processor))
+
+    def on_load_change(self, processor):
+        self.refresh(processor)
+
+    def select(self, task):
+        return self.processors[self.index.peek()]
+
+
+@register_policy
+class LeastLoadedPolicy(IndexedPolicy):
+    name = "least_loaded"
+
+    def score(self, processor):
+        return processor.current_load
+
+
+@register_policy
+class WeightedPolicy(IndexedPolicy):
+    # Least load relative to processing speed
+    name = "weighted"
+
+    def score(self, processor):
+        return processor.current_load / processor.processing_speed
+
+    def on_speed_change(self, processor):
+        self.refresh(processor)
+
+
+class StrideScheduler:
+    # Smooth weighted round robin by stride scheduling. Each item's next turn
+    # is due one stride (1 / weight) after its last, and the item due
+    # earliest goes next, so turns are spread evenly in proportion to the
+    # weights rather than in bursts. Due times sit in an IndexedMinHeap
+    # (ties to the lowest item), so a pick or a weight change is O(log n)
+    # with no precomputed cycle; equal weights give plain round robin.
+    def __init__(self, weights=()):
+        self.index = IndexedMinHeap()
+        self.strides = {}
+        self.virtual_time = 0.0  # Due time of the last pick
+        for item, weight in enumerate(weights):
+            self.set_weight(item, weight)
+
+    def __len__(self):
+        return len(self.index)
+
+    def set_weight(self, item, weight):
+        # A new or re-weighted item gets its next turn one stride from now
+        self.strides[item] = 1 / weight
+        self.index.push(item, self.virtual_time + self.strides[item])
+
+    def next(self):
+        item = self.index.peek()
+        self.virtual_time = self.index.priority(item)
+        self.index.update(item, self.virtual_time + self.strides[item])
+        return item
+
+
+@register_policy
+class SmoothWeightedPolicy(Policy):
+    # Smooth weighted round robin with processing_speed as the weight, via a
+    # StrideScheduler: O(log P) per decision and per speed change
+    name = "smooth_weighted"
+
+    def rebuild(self):
+        self.scheduler = StrideScheduler(p.processing_speed for p in self.processors)
+
+    def on_speed_change(self, processor):
+        if processor.id < len(self.scheduler):
+            self.scheduler.set_weight(processor.id, processor.processing_speed)
+
+    def select(self, task):
+        return self.processors[self.scheduler.next()]
+
+
+@register_policy
+class AdaptivePolicy(IndexedPolicy):
+    # Considers both load and processing speed and adjusts based on recent
+    # performance. Scores are refreshed on every load, speed and history
+    # change, so the best processor is read off the top of the index.
+    name = "adaptive"
+    uses_history = True
+
+    def score(self, processor):
+        # Lower score is better
+        return ((processor.current_load / processor.capacity) * (1 / processor.processing_speed)
+                * (1 + processor.get_recent_load() / 200))
+
+    def on_speed_change(self, processor):
+        self.refresh(processor)
+
+    def on_history_update(self, processor):
+        self.refresh(processor)
+
+
+@register_policy
+class PowerOfDChoicesPolicy(Policy):
+    # Samples d processors at random and assigns to the least loaded of them
+    # (load divided by processing_speed when speed_aware), so each decision
+    # is O(d) no matter how many processors there are
+    name = "power_of_d"
+
+    def __init__(self, balancer, d=2, speed_aware=False, seed=None):
+        if d < 1:
+            raise ValueError("power_of_d needs d >= 1")
+        self.d = d
+        self.speed_aware = speed_aware
+        self.rng = random.Random(seed)
+        super().__init__(balancer)
+
+    def score(self, processor):
+        if self.speed_aware:
+            return processor.current_load / processor.processing_speed
+        return processor.current_load
+
+    def select(self, task):
+        processors = self.processors
+        if self.d >= len(processors):
+            candidates = processors
+        else:
+            candidates = [processors[i] for i in self.rng.sample(range(len(processors)), self.d)]
+        return min(candidates, key=self.score)
+
+
+@register_policy
+class JoinShortestQueuePolicy(IndexedPolicy):
+    # Fewest tasks rather than least load, kept in an indexed heap
+    name = "jsq"
+
+    def score(self, processor):
+        return len(processor.tasks)
+
+
+@register_policy
+class JoinIdleQueuePolicy(Policy):
+    # Join-Idle-Queue: a processor that runs out of tasks reports itself to
+    # one dispatcher's idle queue (picked at random). Each task goes to a
+    # random dispatcher, which hands it to the longest-idle processor in its
+    # queue if there is one and to a random processor otherwise. Every
+    # decision is O(1), with no scan over the cluster.
+    name = "jiq"
+
+    def __init__(self, balancer, dispatchers=1, seed=None):
+        if dispatchers < 1:
+            raise ValueError("jiq needs at least one dispatcher")
+        self.dispatchers = dispatchers
+        self.rng = random.Random(seed)
+        super().__init__(balancer)
+
+    def rebuild(self):
+        # One insertion-ordered dict per dispatcher used as a FIFO set of
+        # processor ids, plus where each idle processor has reported
+        self.idle_queues = [{} for _ in range(self.dispatchers)]
+        self.reported_to = {}
+        for processor in self.processors:
+            if not processor.tasks:
+                self._report_idle(processor)
+
+    def _report_idle(self, processor):
+        if processor.id not in self.reported_to:
+            queue = self.rng.randrange(self.dispatchers)
+            self.idle_queues[queue][processor.id] = None
+            self.reported_to[processor.id] = queue
+
+    def on_add(self, processor, task):
+        queue = self.reported_to.pop(processor.id, None)
+        if queue is not None:
+            del self.idle_queues[queue][processor.id]
+
+    def on_remove(self, processor, task):
+        if not processor.tasks and processor.id < len(self.processors):
+            self._report_idle(processor)
+
+    def select(self, task):
+        idle = self.idle_queues[self.rng.randrange(self.dispatchers)]
+        if idle:
+            processor = self.processors[next(iter(idle))]
+        else:
+            processor = self.processors[self.rng.randrange(len(self.processors))]
+        return processor  # Once the task is placed, on_add takes it out of the idle queue
+
+
+def _ring_hash(value):
+    # Stable across processes, unlike hash() on strings
+    return int.from_bytes(blake2b(str(value).encode(), digest_size=8).digest(), "big")
+
+
+@register_policy
+class BoundedConsistentHashPolicy(Policy):
+    # Consistent hashing with bounded loads. Each processor owns `replicas`
+    # virtual nodes on a hash ring and a task goes to the first node
+    # clockwise from its key's hash (O(log(P * replicas)) by bisection),
+    # skipping processors already at or above (1 + epsilon) times the
+    # average load. Tasks without a key are hashed by id. A task counts as a
+    # cache hit when it lands where its key was last served, so the hit
+    # rate shows what tighter bounds and resizing cost in affinity. Node
+    # hashes are cached per processor id, and a resize splices only the added
+    # or removed processors' nodes into the ring; the ring is kept in typed
+    # arrays so those splices are plain memory copies.
+    name = "chwbl"
+
+    def __init__(self, balancer, epsilon=0.25, replicas=100):
+        self.epsilon = epsilon
+        self.replicas = replicas
+        self.key_home = {}  # Key -> processor id that last served it
+        self.lookups = 0
+        self.hits = 0
+        self.node_hashes = {}  # Processor id -> sorted hashes of its virtual nodes
+        self.ring_hashes = array("Q")
+        self.ring_owners = array("l")
+        self.ring_size = 0  # Processors on the ring, always ids 0..ring_size-1
+        super().__init__(balancer)
+
+    def _nodes(self, pids):
+        # (hash, owner) of every virtual node of the given processors, sorted
+        nodes = []
+        for pid in pids:
+            if pid not in self.node_hashes:
+                self.node_hashes[pid] = sorted(_ring_hash(f"{pid}-{i}") for i in range(self.replicas))
+            nodes.extend((h, pid) for h in self.node_hashes[pid])
+        nodes.sort()
+        return nodes
+
+    def rebuild(self):
+        count = len(self.processors)
+        if count > self.ring_size:
+            self._splice_in(self._nodes(range(self.ring_size, count)))
+        elif count < self.ring_size:
+            self._splice_out(self._nodes(range(count, self.ring_size)))
+        self.ring_size = count
+        self.total_load = sum(p.current_load for p in self.processors)
+
+    def _splice_in(self, nodes):
+        # Merge sorted new nodes into the ring. New ids are larger than every
+        # id on the ring, so they go after existing nodes with the same hash.
+        hashes, owners = array("Q"), array("l")
+        start = 0
+        for h, pid in nodes:
+            end = bisect_right(self.ring_hashes, h, start)
+            hashes += self.ring_hashes[start:end]
+            owners += self.ring_owners[start:end]
+            hashes.append(h)
+            owners.append(pid)
+            start = end
+        self.ring_hashes = hashes + self.ring_hashes[start:]
+        self.ring_owners = owners + self.ring_owners[start:]
+
+    def _splice_out(self, nodes):
+        # Drop the given nodes from the ring, copying what's kept in slices
+        hashes, owners = array("Q"), array("l")
+        start = 0
+        for h, pid in nodes:
+            end = bisect_left(self.ring_hashes, h, start)
+            while self.ring_owners[end] != pid:  # Hash shared with another processor
+                end += 1
+            hashes += self.ring_hashes[start:end]
+            owners += self.ring_owners[start:end]
+            start = end + 1
+        self.ring_hashes = hashes + self.ring_hashes[start:]
+        self.ring_owners = owners + self.ring_owners[start:]
+
+    def on_add(self, processor, task):
+        self.total_load += task.load
+
+    def on_remove(self, processor, task):
+        self.total_load -= task.load
+
+    def select(self, task):
+        key = task.key if task.key is not None else task.id
+        # The paper bounds task counts by a ceiling, which always leaves room for
+        # one more task; in load units that means never going below the task itself
+        bound = max((1 + self.epsilon) * (self.total_load + task.load) / len(self.processors), task.load)
+
+        # Walk clockwise to the first processor whose load is still under the
+        # bound (the paper's ceiling semantics, so a task bigger than the
+        # average still goes to its key's processor when that one has room).
+        # Some processor is always at or below average, so the walk ends within
+        # P distinct processors; the least loaded fallback only covers bound 0.
+        start = bisect_left(self.ring_hashes, _ring_hash(key))
+        seen = set()
+        fallback = None
+        for step in range(len(self.ring_owners)):
+            owner = self.ring_owners[(start + step) % len(self.ring_owners)]
+            if owner in seen:
+                continue
+            seen.add(owner)
+            candidate = self.processors[owner]
+            if candidate.current_load < bound:
+                return candidate
+            if fallback is None or candidate.current_load < fallback.current_load:
+                fallback = candidate
+            if len(seen) == len(self.processors):
+                break
+        return fallback
+
+    def on_assign(self, processor, task):
+        if task.key is not None:
+            self.lookups += 1
+            if self.key_home.get(task.key) == processor.id:
+                self.hits += 1
+            self.key_home[task.key] = processor.id
+
+    def stats(self):
+        hit_rate = self.hits / self.lookups if self.lookups else 0.0
+        return {"cache_hit_rate": hit_rate}
+
+
+@register_policy
+class HierarchicalPolicy(Policy):
+    # Two-level balancing for very large clusters. Processors are grouped into
+    # pools of pool_size consecutive ids (racks or zones). A top-level heap
+    # keeps pools keyed by aggregate utilisation, and the pool's own
+    # structure picks the processor: a per-pool load heap (least_loaded), a
+    # per-pool cursor (round_robin) or d random members (power_of_d). Pool
+    # aggregates are updated incrementally on every add/remove, so a decision
+    # costs O(log pools + log pool_size) at most.
+    name = "hierarchical"
+    WITHIN = ("least_loaded", "round_robin", "power_of_d")
+
+    def __init__(self, balancer, pool_size=32, within="least_loaded", d=2, seed=None):
+        if pool_size < 1:
+            raise ValueError("hierarchical needs pool_size >= 1")
+        if within not in self.WITHIN:
+            raise ValueError(f"hierarchical within must be one of {self.WITHIN}")
+        self.pool_size = pool_size
+        self.within = within
+        self.d = d
+        self.rng = random.Random(seed)
+        super().__init__(balancer)
+
+    def rebuild(self):
+        count = -(-len(self.processors) // self.pool_size)
+        self.pool_load = [0.0] * count
+        self.pool_capacity = [0.0] * count
+        self.cursors = [0] * count
+        self.member_index = [IndexedMinHeap() for _ in range(count)]
+        for processor in self.processors:
+            pool = processor.id // self.pool_size
+            self.pool_load[pool] += processor.current_load
+            self.pool_capacity[pool] += processor.capacity
+            if self.within == "least_loaded":
+                self.member_index[pool].push(processor.id, processor.current_load)
+        self.pool_index = IndexedMinHeap()
+        for pool in range(count):
+            self.pool_index.push(pool, self.pool_load[pool] / self.pool_capacity[pool])
+
+    def _changed(self, processor, delta):
+        pool = processor.id // self.pool_size
+        if pool >= len(self.pool_load):
+            return
+        self.pool_load[pool] += delta
+        self.pool_index.update(pool, self.pool_load[pool] / self.pool_capacity[pool])
+        if self.within == "least_loaded":
+            self.member_index[pool].update(processor.id, processor.current_load)
+
+    def on_add(self, processor, task):
+        self._changed(processor, task.load)
+
+    def on_remove(self, processor, task):
+        self._changed(processor, -task.load)
+
+    def select(self, task):
+        pool = self.pool_index.peek()
+        start = pool * self.pool_size
+        size = min(self.pool_size, len(self.processors) - start)
+        if self.within == "least_loaded":
+            processor = self.processors[self.member_index[pool].peek()]
+        elif self.within == "round_robin":
+            processor = self.processors[start + self.cursors[pool]]
+            self.cursors[pool] = (self.cursors[pool] + 1) % size
+        else:
+            members = self.rng.sample(range(start, start + size), min(self.d, size))
+            processor = min((self.processors[i] for i in members), key=lambda p: p.current_load)
+        return processor
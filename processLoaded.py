@@ -1,499 +1,566 @@
-import tkinter as tk
-from tkinter import ttk, messagebox, colorchooser
-import random
-import time
-import threading
-from queue import Queue
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import numpy as np
-
-class Processor:
-    def __init__(self, id, capacity=100, processing_speed=1.0):
-        self.id = id
-        self.capacity = capacity  # Maximum load capacity
-        self.processing_speed = processing_speed  # Speed multiplier
-        self.current_load = 0  # Current load (0-100%)
-        self.tasks = []  # List of tasks currently assigned
-        self.history = []  # History of load values for plotting
-        
-    def add_task(self, task):
-        self.tasks.append(task)
-        self.current_load += task.load
-        
-    def remove_task(self, task):
-        if task in self.tasks:
-            self.tasks.remove(task)
-            self.current_load -= task.load
-            
-    def process_tasks(self):
-        # Process tasks based on processing speed
-        completed_tasks = []
-        for task in self.tasks:
-            task.remaining_time -= self.processing_speed
-            if task.remaining_time <= 0:
-                completed_tasks.append(task)
-                
-        # Remove completed tasks
-        for task in completed_tasks:
-            self.remove_task(task)
-        
-    # Update history
-        self.update_history()
-        
-        return completed_tasks
-
-    def update_history(self):
-        # Record history for plotting
-        self.history.append(self.current_load)
-        if len(self.history) > 100:  # Keep only last 100 points
-            self.history = self.history[-100:]
-    
-    def get_available_capacity(self):
-        return self.capacity - self.current_load
-
-class Task:
-    def __init__(self, id, load, execution_time):
-        self.id = id
-        self.load = load  # CPU load (0-100%)
-        self.execution_time = execution_time  # Time to complete
-        self.remaining_time = execution_time  # Remaining time
-        self.processor = None  # Assigned processor
-
-class LoadBalancer:
-    def __init__(self, num_processors=4):
-        self.processors = [Processor(i) for i in range(num_processors)]
-        self.task_queue = Queue()
-        self.completed_tasks = 0
-        self.task_id_counter = 0
-        self.algorithm = "round_robin"  # Default algorithm
-        self.running = False
-        self.paused = False
-        
-    def add_task(self, load, execution_time):
-        task = Task(self.task_id_counter, load, execution_time)
-        self.task_id_counter += 1
-        self.task_queue.put(task)
-        
-    def distribute_tasks(self):
-        # Distribute tasks from queue to processors based on selected algorithm
-        while not self.task_queue.empty():
-            task = self.task_queue.get()
-            
-            if self.algorithm == "round_robin":
-                self._round_robin(task)
-            elif self.algorithm == "least_loaded":
-                self._least_loaded(task)
-            elif self.algorithm == "weighted":
-                self._weighted_distribution(task)
-            elif self.algorithm == "adaptive":
-                self._adaptive_distribution(task)
-                
-    def _round_robin(self, task):
-        # Simple round-robin assignment
-        assigned = False
-        for processor in self.processors:
-            if processor.get_available_capacity() >= task.load:
-                processor.add_task(task)
-                assigned = True
-                break
-                
-        # If no processor has capacity, assign to the first one anyway
-        if not assigned and self.processors:
-            self.processors[0].add_task(task)
-            
-    def _least_loaded(self, task):
-        # Assign to processor with least current load
-        processors = sorted(self.processors, key=lambda p: p.current_load)
-        if processors and processors[0].get_available_capacity() >= task.load:
-            processors[0].add_task(task)
-        elif processors:  # Assign anyway if all are overloaded
-            processors[0].add_task(task)
-            
-    def _weighted_distribution(self, task):
-        # Distribute based on processing speed
-        processors = sorted(self.processors, 
-                           key=lambda p: p.current_load / p.processing_speed)
-        if processors and processors[0].get_available_capacity() >= task.load:
-            processors[0].add_task(task)
-        elif processors:
-            processors[0].add_task(task)
-            
-    def _adaptive_distribution(self, task):
-        # Adaptive algorithm that considers both load and processing speed
-        # and adjusts based on recent performance
-        
-        # Calculate a score for each processor
-        scores = []
-        for p in self.processors:
-            # Lower score is better
-            recent_load = sum(p.history[-10:]) / max(len(p.history[-10:]), 1)
-            score = (p.current_load / p.capacity) * (1 / p.processing_speed) * (1 + recent_load/200)
-            scores.append((p, score))
-            
-        # Sort by score (lower is better)
-        processors = [p for p, _ in sorted(scores, key=lambda x: x[1])]
-        
-        if processors and processors[0].get_available_capacity() >= task.load:
-            processors[0].add_task(task)
-        elif processors:
-            processors[0].add_task(task)
-            
-    def process_cycle(self):
-        # Process one cycle of tasks on all processors
-        completed = []
-        for processor in self.processors:
-            # Make sure history is updated even if no tasks are processed
-            if not processor.tasks:
-                processor.update_history()
-            completed.extend(processor.process_tasks())
-        
-        self.completed_tasks += len(completed)
-        return completed
-        
-    def run_simulation(self, task_generator, update_callback):
-        self.running = True
-        while self.running:
-            if not self.paused:
-                # Generate new tasks
-                new_tasks = task_generator()
-                for load, exec_time in new_tasks:
-                    # self.add_task(load, time)
-                    self.add_task(load, exec_time)
-                
-                # Distribute tasks from queue
-                self.distribute_tasks()
-                
-                # Process tasks on processors
-                self.process_cycle()
-                
-                # Update UI
-                update_callback()
-                
-            time.sleep(0.1)  # Simulation speed
-
-class LoadBalancerApp:
-    def __init__(self, root):
-        self.root = root
-        self.root.title("Dynamic Load Balancer Simulation")
-        self.root.geometry("1200x800")
-        self.root.configure(bg="#f0f0f0")
-        
-        # Create load balancer with default 4 processors
-        self.load_balancer = LoadBalancer(4)
-        
-        # Create UI components
-        self.create_ui()
-        
-        # Start simulation thread
-        self.simulation_thread = threading.Thread(target=self.load_balancer.run_simulation, 
-                                                args=(self.generate_tasks, self.update_ui))
-        self.simulation_thread.daemon = True
-        self.simulation_thread.start()
-        
-    def create_ui(self):
-        # Main frame
-        main_frame = ttk.Frame(self.root, padding=10)
-        main_frame.pack(fill=tk.BOTH, expand=True)
-        
-        # Control panel (left side)
-        control_frame = ttk.LabelFrame(main_frame, text="Controls", padding=10)
-        control_frame.pack(side=tk.LEFT, fill=tk.Y, padx=5, pady=5)
-        
-        # Algorithm selection
-        ttk.Label(control_frame, text="Load Balancing Algorithm:").pack(anchor=tk.W, pady=5)
-        self.algorithm_var = tk.StringVar(value=self.load_balancer.algorithm)
-        algorithms = ["round_robin", "least_loaded", "weighted", "adaptive"]
-        algorithm_menu = ttk.Combobox(control_frame, textvariable=self.algorithm_var, 
-                                     values=algorithms, state="readonly")
-        algorithm_menu.pack(fill=tk.X, pady=5)
-        algorithm_menu.bind("<<ComboboxSelected>>", self.change_algorithm)
-        
-        # Number of processors
-        ttk.Label(control_frame, text="Number of Processors:").pack(anchor=tk.W, pady=5)
-        self.processor_var = tk.IntVar(value=4)
-        processor_scale = ttk.Scale(control_frame, from_=1, to=16, 
-                                   variable=self.processor_var, orient=tk.HORIZONTAL)
-        processor_scale.pack(fill=tk.X, pady=5)
-        processor_scale.bind("<ButtonRelease-1>", self.change_processors)
-        self.processor_label = ttk.Label(control_frame, text="4")
-        self.processor_label.pack(anchor=tk.W)
-        
-        # Task generation rate
-        ttk.Label(control_frame, text="Task Generation Rate:").pack(anchor=tk.W, pady=5)
-        self.task_rate_var = tk.DoubleVar(value=1.0)
-        task_rate_scale = ttk.Scale(control_frame, from_=0.1, to=5.0, 
-                                   variable=self.task_rate_var, orient=tk.HORIZONTAL)
-        task_rate_scale.pack(fill=tk.X, pady=5)
-        self.task_rate_label = ttk.Label(control_frame, text="1.0 tasks/sec")
-        self.task_rate_label.pack(anchor=tk.W)
-        task_rate_scale.bind("<Motion>", self.update_task_rate_label)
-        
-        # Task size
-        ttk.Label(control_frame, text="Average Task Size:").pack(anchor=tk.W, pady=5)
-        self.task_size_var = tk.IntVar(value=20)
-        task_size_scale = ttk.Scale(control_frame, from_=5, to=50, 
-                                   variable=self.task_size_var, orient=tk.HORIZONTAL)
-        task_size_scale.pack(fill=tk.X, pady=5)
-        self.task_size_label = ttk.Label(control_frame, text="20% CPU load")
-        self.task_size_label.pack(anchor=tk.W)
-        task_size_scale.bind("<Motion>", self.update_task_size_label)
-        
-        # Task duration
-        ttk.Label(control_frame, text="Average Task Duration:").pack(anchor=tk.W, pady=5)
-        self.task_duration_var = tk.DoubleVar(value=5.0)
-        task_duration_scale = ttk.Scale(control_frame, from_=1.0, to=20.0, 
-                                      variable=self.task_duration_var, orient=tk.HORIZONTAL)
-        task_duration_scale.pack(fill=tk.X, pady=5)
-        self.task_duration_label = ttk.Label(control_frame, text="5.0 seconds")
-        self.task_duration_label.pack(anchor=tk.W)
-        task_duration_scale.bind("<Motion>", self.update_task_duration_label)
-        
-        # Control buttons
-        button_frame = ttk.Frame(control_frame)
-        button_frame.pack(fill=tk.X, pady=10)
-        
-        self.pause_button = ttk.Button(button_frame, text="Pause", command=self.toggle_pause)
-        self.pause_button.pack(side=tk.LEFT, padx=5)
-        
-        self.reset_button = ttk.Button(button_frame, text="Reset", command=self.reset_simulation)
-        self.reset_button.pack(side=tk.LEFT, padx=5)
-        
-        # Stats display
-        stats_frame = ttk.LabelFrame(control_frame, text="Statistics", padding=10)
-        stats_frame.pack(fill=tk.X, pady=10)
-        
-        self.queue_label = ttk.Label(stats_frame, text="Tasks in Queue: 0")
-        self.queue_label.pack(anchor=tk.W, pady=2)
-        
-        self.completed_label = ttk.Label(stats_frame, text="Completed Tasks: 0")
-        self.completed_label.pack(anchor=tk.W, pady=2)
-        
-        self.avg_load_label = ttk.Label(stats_frame, text="Average Load: 0%")
-        self.avg_load_label.pack(anchor=tk.W, pady=2)
-        
-        # Visualization panel (right side)
-        viz_frame = ttk.Frame(main_frame)
-        viz_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
-        # Processor visualization
-        self.processor_frame = ttk.LabelFrame(viz_frame, text="Processors", padding=10)
-        self.processor_frame.pack(fill=tk.BOTH, expand=True, pady=5)
-        
-        # Create processor displays
-        self.processor_displays = []
-        self.update_processor_displays()
-        
-        # Load history graph
-        graph_frame = ttk.LabelFrame(viz_frame, text="Load History", padding=10)
-        graph_frame.pack(fill=tk.BOTH, expand=True, pady=5)
-
-        # Create figure with proper size and DPI for Tkinter
-        self.fig, self.ax = plt.subplots(figsize=(6, 3), dpi=100)
-        self.canvas = FigureCanvasTkAgg(self.fig, master=graph_frame)
-        self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-
-        # Initialize empty plot
-        self.ax.set_ylim(0, 100)
-        self.ax.set_ylabel("Load (%)")
-        self.ax.set_xlabel("Time")
-        self.ax.grid(True, linestyle='--', alpha=0.7)
-        self.fig.tight_layout()
-        
-    def update_processor_displays(self):
-        # Clear existing displays
-        for widget in self.processor_frame.winfo_children():
-            widget.destroy()
-            
-        # Create new processor displays
-        self.processor_displays = []
-        for i, processor in enumerate(self.load_balancer.processors):
-            frame = ttk.Frame(self.processor_frame, padding=5)
-            frame.grid(row=i//2, column=i%2, sticky=tk.NSEW, padx=5, pady=5)
-            
-            # Processor label
-            label = ttk.Label(frame, text=f"Processor {processor.id}")
-            label.pack(anchor=tk.W)
-            
-            # Load bar
-            canvas = tk.Canvas(frame, width=200, height=30, bg="#e0e0e0")
-            canvas.pack(fill=tk.X, pady=5)
-            
-            # Task count
-            task_label = ttk.Label(frame, text="Tasks: 0")
-            task_label.pack(anchor=tk.W)
-            
-            # Speed control
-            speed_frame = ttk.Frame(frame)
-            speed_frame.pack(fill=tk.X)
-            
-            ttk.Label(speed_frame, text="Speed:").pack(side=tk.LEFT)
-            speed_var = tk.DoubleVar(value=processor.processing_speed)
-            speed_scale = ttk.Scale(speed_frame, from_=0.5, to=2.0, 
-                                   variable=speed_var, orient=tk.HORIZONTAL)
-            speed_scale.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
-            
-            speed_label = ttk.Label(speed_frame, text=f"{processor.processing_speed:.1f}x")
-            speed_label.pack(side=tk.LEFT)
-            
-            # Store references
-            self.processor_displays.append({
-                'frame': frame,
-                'canvas': canvas,
-                'task_label': task_label,
-                'speed_var': speed_var,
-                'speed_label': speed_label,
-                'processor': processor
-            })
-            
-            # Bind speed change
-            speed_scale.bind("<Motion>", lambda e, p=processor, sl=speed_label, sv=speed_var: 
-                           self.update_processor_speed(p, sl, sv))
-            
-        # Configure grid
-        for i in range(2):
-            self.processor_frame.columnconfigure(i, weight=1)
-            
-    def update_processor_speed(self, processor, label, var):
-        processor.processing_speed = var.get()
-        label.config(text=f"{processor.processing_speed:.1f}x")
-        
-    def update_ui(self):
-        # Update processor displays
-        for display in self.processor_displays:
-            processor = display['processor']
-            canvas = display['canvas']
-            
-            # Update load bar
-            canvas.delete("all")
-            width = canvas.winfo_width()
-            load_width = (processor.current_load / processor.capacity) * width
-            
-            # Color based on load
-            if processor.current_load < 60:
-                color = "#4CAF50"  # Green
-            elif processor.current_load < 85:
-                color = "#FFC107"  # Yellow
-            else:
-                color = "#F44336"  # Red
-                
-            canvas.create_rectangle(0, 0, load_width, 30, fill=color, outline="")
-            canvas.create_text(width/2, 15, text=f"{processor.current_load:.1f}%", 
-                             fill="black", font=("Arial", 10, "bold"))
-            
-            # Update task count
-            display['task_label'].config(text=f"Tasks: {len(processor.tasks)}")
-            
-        # Update statistics
-        self.queue_label.config(text=f"Tasks in Queue: {self.load_balancer.task_queue.qsize()}")
-        self.completed_label.config(text=f"Completed Tasks: {self.load_balancer.completed_tasks}")
-        
-        # Calculate average load
-        if self.load_balancer.processors:
-            avg_load = sum(p.current_load for p in self.load_balancer.processors) / len(self.load_balancer.processors)
-            self.avg_load_label.config(text=f"Average Load: {avg_load:.1f}%")
-            
-        # Update graph
-        self.update_graph()
-        
-    def update_graph(self):
-        self.ax.clear()
-    
-        # Plot load history for each processor
-        for i, processor in enumerate(self.load_balancer.processors):
-            if processor.history:
-                # Use a different color for each processor
-                color = plt.cm.tab10(i % 10)
-                self.ax.plot(processor.history, label=f"Processor {i}", color=color, linewidth=2)
-    
-        # Set proper limits and labels
-        self.ax.set_ylim(0, 110)  # Give a little headroom above 100%
-        self.ax.set_ylabel("Load (%)")
-        self.ax.set_xlabel("Time")
-    
-        # Add legend with smaller font to save space
-        self.ax.legend(loc="upper right", fontsize='small')
-        self.ax.grid(True, linestyle='--', alpha=0.7)
-    
-        # Make sure the figure has a tight layout
-        self.fig.tight_layout()
-    
-        # Force redraw
-        self.canvas.draw_idle()
-        
-    def generate_tasks(self):
-        # Generate random tasks based on current settings
-        tasks = []
-        rate = self.task_rate_var.get()
-        
-        # Randomly generate tasks based on rate
-        if random.random() < rate * 0.1:  # Adjust for simulation speed
-            size = max(5, min(100, random.gauss(self.task_size_var.get(), 10)))
-            duration = max(1, random.gauss(self.task_duration_var.get(), 2))
-            tasks.append((size, duration))
-            
-        return tasks
-        
-    def change_algorithm(self, event):
-        self.load_balancer.algorithm = self.algorithm_var.get()
-        
-    def change_processors(self, event):
-        num_processors = int(self.processor_var.get())
-        self.processor_label.config(text=str(num_processors))
-        
-        # Update processor count
-        current_count = len(self.load_balancer.processors)
-        
-        if num_processors > current_count:
-            # Add processors
-            for i in range(current_count, num_processors):
-                self.load_balancer.processors.append(Processor(i))
-        elif num_processors < current_count:
-            # Remove processors and redistribute their tasks
-            removed_tasks = []
-            for processor in self.load_balancer.processors[num_processors:]:
-                for task in processor.tasks:
-                    removed_tasks.append(task)
-                    
-            self.load_balancer.processors = self.load_balancer.processors[:num_processors]
-            
-            # Put removed tasks back in queue
-            for task in removed_tasks:
-                self.load_balancer.task_queue.put(task)
-                
-        # Update UI
-        self.update_processor_displays()
-        
-    def update_task_rate_label(self, event):
-        self.task_rate_label.config(text=f"{self.task_rate_var.get():.1f} tasks/sec")
-        
-    def update_task_size_label(self, event):
-        self.task_size_label.config(text=f"{self.task_size_var.get()}% CPU load")
-        
-    def update_task_duration_label(self, event):
-        self.task_duration_label.config(text=f"{self.task_duration_var.get():.1f} seconds")
-        
-    def toggle_pause(self):
-        self.load_balancer.paused = not self.load_balancer.paused
-        self.pause_button.config(text="Resume" if self.load_balancer.paused else "Pause")
-        
-    def reset_simulation(self):
-        # Reset the simulation
-        num_processors = len(self.load_balancer.processors)
-        self.load_balancer = LoadBalancer(num_processors)
-        self.load_balancer.algorithm = self.algorithm_var.get()
-        
-        # Update UI
-        self.update_processor_displays()
-        
-        # Restart simulation thread if needed
-        if not self.simulation_thread.is_alive():
-            self.simulation_thread = threading.Thread(target=self.load_balancer.run_simulation, 
-                                                    args=(self.generate_tasks, self.update_ui))
-            self.simulation_thread.daemon = True
-            self.simulation_thread.start()
-
-if __name__ == "__main__":
-    root = tk.Tk()
-    app = LoadBalancerApp(root)
-    root.mainloop()
+import argparse
+import tkinter as tk
+from tkinter import ttk, messagebox, colorchooser, filedialog
+import random
+import threading
+import time
+import numpy as np
+from canvasChart import CanvasLineChart, SERIES_COLORS
+from loadBalancer import LoadBalancer
+from policies import available_policies
+# matplotlib is imported lazily: only the "matplotlib" chart and graph export need it
+
+BAR_REDRAW_THRESHOLD = 0.5  # Load change (%) below which a processor's bar is left as is
+MAX_PROCESSORS = 4096
+DETAIL_VIEW_LIMIT = 16  # Above this many processors, show the heatmap instead of per-processor widgets
+
+# Heatmap colors by utilisation, 0 to 2x capacity: the load bar colors, then
+# purple for overload
+HEATMAP_STOPS = [0.0, 0.6, 0.85, 1.0, 2.0]
+HEATMAP_COLORS = np.array([[0x4C, 0xAF, 0x50], [0xFF, 0xC1, 0x07], [0xF4, 0x43, 0x36],
+                           [0xF4, 0x43, 0x36], [0x7B, 0x1F, 0xA2]], dtype=float)
+HEATMAP_LUT = np.stack([np.interp(np.linspace(0, 2, 256), HEATMAP_STOPS, HEATMAP_COLORS[:, c])
+                        for c in range(3)], axis=1).astype(np.uint8)
+HEATMAP_BACKGROUND = (0xE0, 0xE0, 0xE0)
+
+class LoadBalancerApp:
+    def __init__(self, root, fps=20, chart="canvas"):
+        self.root = root
+        self.chart_type = chart  # "canvas" (Tk polylines) or "matplotlib" (blitted Agg)
+        self.root.title("Dynamic Load Balancer Simulation")
+        self.root.geometry("1200x800")
+        self.root.configure(bg="#f0f0f0")
+        
+        # Create load balancer with default 4 processors
+        self.load_balancer = LoadBalancer(4)
+        
+        # The simulation thread publishes a snapshot when one has been asked
+        # for, and the Tk loop renders the newest one at a fixed frame rate
+        self.frame_interval = 1.0 / fps
+        self.latest_snapshot = None
+        self.rendered_snapshot = None
+        self.snapshot_requested = True
+        
+        # Create UI components
+        self.create_ui()
+        
+        # Start simulation thread and the render loop
+        self.start_simulation()
+        self.render_frame()
+        
+    def start_simulation(self):
+        load_balancer = self.load_balancer
+        self.simulation_thread = threading.Thread(target=load_balancer.run_simulation, 
+                                                args=(self.generate_tasks,
+                                                      lambda: self.publish_snapshot(load_balancer)))
+        self.simulation_thread.daemon = True
+        self.simulation_thread.start()
+        
+    def publish_snapshot(self, load_balancer):
+        # Simulation thread: only pay for a copy when the next frame needs one
+        if self.snapshot_requested and load_balancer is self.load_balancer:
+            self.snapshot_requested = False
+            self.latest_snapshot = load_balancer.snapshot()
+            
+    def render_frame(self):
+        # Tk thread: draw the newest snapshot, skipping any published in between
+        started = time.perf_counter()
+        snapshot = self.latest_snapshot
+        if snapshot is not None and snapshot is not self.rendered_snapshot:
+            self.update_ui(snapshot)
+            self.rendered_snapshot = snapshot
+        self.snapshot_requested = True
+        
+        # If rendering overran the frame, go again right away rather than
+        # trying to catch up on the frames that were missed
+        remaining = self.frame_interval - (time.perf_counter() - started)
+        self.root.after(max(1, int(remaining * 1000)), self.render_frame)
+        
+    def create_ui(self):
+        # Main frame
+        main_frame = ttk.Frame(self.root, padding=10)
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        
+        # Control panel (left side)
+        control_frame = ttk.LabelFrame(main_frame, text="Controls", padding=10)
+        control_frame.pack(side=tk.LEFT, fill=tk.Y, padx=5, pady=5)
+        
+        # Algorithm selection
+        ttk.Label(control_frame, text="Load Balancing Algorithm:").pack(anchor=tk.W, pady=5)
+        self.algorithm_var = tk.StringVar(value=self.load_balancer.algorithm)
+        algorithms = available_policies()
+        algorithm_menu = ttk.Combobox(control_frame, textvariable=self.algorithm_var, 
+                                     values=algorithms, state="readonly")
+        algorithm_menu.pack(fill=tk.X, pady=5)
+        algorithm_menu.bind("<<ComboboxSelected>>", self.change_algorithm)
+        
+        # Number of processors
+        ttk.Label(control_frame, text="Number of Processors:").pack(anchor=tk.W, pady=5)
+        self.processor_var = tk.IntVar(value=4)
+        processor_spinbox = ttk.Spinbox(control_frame, from_=1, to=MAX_PROCESSORS, 
+                                        textvariable=self.processor_var, command=self.change_processors)
+        processor_spinbox.pack(fill=tk.X, pady=5)
+        processor_spinbox.bind("<Return>", self.change_processors)
+        self.processor_label = ttk.Label(control_frame, text="4")
+        self.processor_label.pack(anchor=tk.W)
+        
+        # Task generation rate
+        ttk.Label(control_frame, text="Task Generation Rate:").pack(anchor=tk.W, pady=5)
+        self.task_rate_var = tk.DoubleVar(value=1.0)
+        self.task_rate = self.task_rate_var.get()  # Mirrors of the sliders, read by generate_tasks
+        task_rate_scale = ttk.Scale(control_frame, from_=0.1, to=5.0, 
+                                   variable=self.task_rate_var, orient=tk.HORIZONTAL,
+                                   command=self.update_task_rate_label)
+        task_rate_scale.pack(fill=tk.X, pady=5)
+        self.task_rate_label = ttk.Label(control_frame, text="1.0 tasks/sec")
+        self.task_rate_label.pack(anchor=tk.W)
+        
+        # Task size
+        ttk.Label(control_frame, text="Average Task Size:").pack(anchor=tk.W, pady=5)
+        self.task_size_var = tk.IntVar(value=20)
+        self.task_size = self.task_size_var.get()
+        task_size_scale = ttk.Scale(control_frame, from_=5, to=50, 
+                                   variable=self.task_size_var, orient=tk.HORIZONTAL,
+                                   command=self.update_task_size_label)
+        task_size_scale.pack(fill=tk.X, pady=5)
+        self.task_size_label = ttk.Label(control_frame, text="20% CPU load")
+        self.task_size_label.pack(anchor=tk.W)
+        
+        # Task duration
+        ttk.Label(control_frame, text="Average Task Duration:").pack(anchor=tk.W, pady=5)
+        self.task_duration_var = tk.DoubleVar(value=5.0)
+        self.task_duration = self.task_duration_var.get()
+        task_duration_scale = ttk.Scale(control_frame, from_=1.0, to=20.0, 
+                                      variable=self.task_duration_var, orient=tk.HORIZONTAL,
+                                      command=self.update_task_duration_label)
+        task_duration_scale.pack(fill=tk.X, pady=5)
+        self.task_duration_label = ttk.Label(control_frame, text="5.0 seconds")
+        self.task_duration_label.pack(anchor=tk.W)
+        
+        # Control buttons
+        button_frame = ttk.Frame(control_frame)
+        button_frame.pack(fill=tk.X, pady=10)
+        
+        self.pause_button = ttk.Button(button_frame, text="Pause", command=self.toggle_pause)
+        self.pause_button.pack(side=tk.LEFT, padx=5)
+        
+        self.reset_button = ttk.Button(button_frame, text="Reset", command=self.reset_simulation)
+        self.reset_button.pack(side=tk.LEFT, padx=5)
+        
+        self.export_button = ttk.Button(button_frame, text="Export Graph", command=self.export_graph)
+        self.export_button.pack(side=tk.LEFT, padx=5)
+        
+        # Stats display
+        stats_frame = ttk.LabelFrame(control_frame, text="Statistics", padding=10)
+        stats_frame.pack(fill=tk.X, pady=10)
+        
+        self.queue_label = ttk.Label(stats_frame, text="Tasks in Queue: 0")
+        self.queue_label.pack(anchor=tk.W, pady=2)
+        
+        self.completed_label = ttk.Label(stats_frame, text="Completed Tasks: 0")
+        self.completed_label.pack(anchor=tk.W, pady=2)
+        
+        self.avg_load_label = ttk.Label(stats_frame, text="Average Load: 0%")
+        self.avg_load_label.pack(anchor=tk.W, pady=2)
+        
+        # Visualization panel (right side)
+        viz_frame = ttk.Frame(main_frame)
+        viz_frame.pack(side=tk.RIGHT, fill=tk.BOTH, expand=True, padx=5, pady=5)
+        
+        # Processor visualization
+        self.processor_frame = ttk.LabelFrame(viz_frame, text="Processors", padding=10)
+        self.processor_frame.pack(fill=tk.BOTH, expand=True, pady=5)
+        
+        # Create processor displays
+        self.processor_displays = []
+        self.update_processor_displays()
+        
+        # Load history graph
+        graph_frame = ttk.LabelFrame(viz_frame, text="Load History", padding=10)
+        graph_frame.pack(fill=tk.BOTH, expand=True, pady=5)
+
+        if self.chart_type == "canvas":
+            self.chart = CanvasLineChart(graph_frame, depth=self.load_balancer.history_depth)
+            self.chart.pack(fill=tk.BOTH, expand=True)
+        else:
+            from matplotlib.figure import Figure
+            from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+            
+            # Create figure with proper size and DPI for Tkinter
+            self.fig = Figure(figsize=(6, 3), dpi=100)
+            self.ax = self.fig.add_subplot()
+            self.canvas = FigureCanvasTkAgg(self.fig, master=graph_frame)
+            self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+            
+            # Static parts of the plot are cached after every full draw (first
+            # show, window resize) and only the lines are blitted on top per tick
+            self.lines = []
+            self.graph_background = None
+            self.canvas.mpl_connect("draw_event", self.on_graph_draw)
+        self.setup_graph()
+        
+    def setup_graph(self):
+        # One persistent line per processor (or mean and max lines for large
+        # clusters); layout is only redone here, when the processor count changes
+        self.graph_aggregate = len(self.load_balancer.processors) > DETAIL_VIEW_LIMIT
+        if self.graph_aggregate:
+            self.graph_labels = ["Mean", "Max"]
+        else:
+            self.graph_labels = [f"Processor {i}" for i in range(len(self.load_balancer.processors))]
+        if self.chart_type == "canvas":
+            self.chart.set_series(self.graph_labels)
+            return
+            
+        self.ax.clear()
+        self.lines = []
+        x = np.arange(self.load_balancer.history_depth)
+        for i, label in enumerate(self.graph_labels):
+            # Use a different color for each processor
+            color = SERIES_COLORS[i % len(SERIES_COLORS)]
+            line, = self.ax.plot(x, np.zeros_like(x, dtype=float), label=label,
+                                 color=color, linewidth=2, animated=True)
+            self.lines.append(line)
+        self.graph_x = x
+        
+        # Set proper limits and labels
+        self.ax.set_xlim(0, max(len(x) - 1, 1))
+        self.ax.set_ylim(0, 110)  # Give a little headroom above 100%
+        self.ax.set_ylabel("Load (%)")
+        self.ax.set_xlabel("Time")
+        
+        # Add legend with smaller font to save space
+        if self.lines:
+            self.ax.legend(loc="upper right", fontsize='small')
+        self.ax.grid(True, linestyle='--', alpha=0.7)
+        self.fig.tight_layout()
+        
+        # Full redraw, which recaptures the background through on_graph_draw
+        self.graph_background = None
+        self.canvas.draw_idle()
+        
+    def on_graph_draw(self, event):
+        self.graph_background = self.canvas.copy_from_bbox(self.ax.bbox)
+        if self.rendered_snapshot is not None:
+            self.draw_lines(self.rendered_snapshot)
+        
+    def update_processor_displays(self):
+        # Clear existing displays
+        for widget in self.processor_frame.winfo_children():
+            widget.destroy()
+            
+        # Create new processor displays
+        self.processor_displays = []
+        self.heatmap = None
+        if len(self.load_balancer.processors) > DETAIL_VIEW_LIMIT:
+            self.create_heatmap()
+            return
+        self.processor_frame.rowconfigure(0, weight=0)
+        for i, processor in enumerate(self.load_balancer.processors):
+            frame = ttk.Frame(self.processor_frame, padding=5)
+            frame.grid(row=i//2, column=i%2, sticky=tk.NSEW, padx=5, pady=5)
+            
+            # Processor label
+            label = ttk.Label(frame, text=f"Processor {processor.id}")
+            label.pack(anchor=tk.W)
+            
+            # Load bar; its items are created once and moved/recolored in update_ui
+            canvas = tk.Canvas(frame, width=200, height=30, bg="#e0e0e0")
+            canvas.pack(fill=tk.X, pady=5)
+            bar = canvas.create_rectangle(0, 0, 0, 30, fill="#4CAF50", outline="")
+            bar_text = canvas.create_text(100, 15, text="0.0%", 
+                                        fill="black", font=("Arial", 10, "bold"))
+            
+            # Task count
+            task_label = ttk.Label(frame, text="Tasks: 0")
+            task_label.pack(anchor=tk.W)
+            
+            # Speed control
+            speed_frame = ttk.Frame(frame)
+            speed_frame.pack(fill=tk.X)
+            
+            ttk.Label(speed_frame, text="Speed:").pack(side=tk.LEFT)
+            speed_var = tk.DoubleVar(value=processor.processing_speed)
+            speed_scale = ttk.Scale(speed_frame, from_=0.5, to=2.0, 
+                                   variable=speed_var, orient=tk.HORIZONTAL)
+            speed_scale.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
+            
+            speed_label = ttk.Label(speed_frame, text=f"{processor.processing_speed:.1f}x")
+            speed_label.pack(side=tk.LEFT)
+            
+            # Store references
+            self.processor_displays.append({
+                'frame': frame,
+                'canvas': canvas,
+                'bar': bar,
+                'bar_text': bar_text,
+                'width': 200,  # Canvas width, kept current by <Configure>
+                'shown_load': None,  # Load the bar currently shows; None forces a redraw
+                'shown_color': None,
+                'shown_tasks': None,
+                'task_label': task_label,
+                'speed_var': speed_var,
+                'speed_label': speed_label,
+                'processor': processor
+            })
+            
+            # Resizing the bar invalidates it
+            canvas.bind("<Configure>", lambda e, d=self.processor_displays[-1]: self.on_bar_resize(d, e))
+            
+            # Bind speed change
+            speed_scale.bind("<Motion>", lambda e, p=processor, sl=speed_label, sv=speed_var: 
+                           self.update_processor_speed(p, sl, sv))
+            
+        # Configure grid
+        for i in range(2):
+            self.processor_frame.columnconfigure(i, weight=1)
+            
+    def create_heatmap(self):
+        # One cell per processor in a single image, redrawn from the load array each frame
+        canvas = tk.Canvas(self.processor_frame, bg="#e0e0e0", highlightthickness=0)
+        canvas.grid(row=0, column=0, columnspan=2, sticky=tk.NSEW)
+        info_label = ttk.Label(self.processor_frame, text="Hover over a cell for details")
+        info_label.grid(row=1, column=0, columnspan=2, sticky=tk.W)
+        self.processor_frame.rowconfigure(0, weight=1)
+        image = tk.PhotoImage()
+        canvas.create_image(0, 0, image=image, anchor=tk.NW)
+        self.heatmap = {
+            'canvas': canvas,
+            'image': image,  # Keep a reference or Tk drops the image
+            'info_label': info_label,
+            'columns': 1,
+            'cell': 1,
+            'hover': None,  # Processor index under the mouse
+        }
+        self.layout_heatmap(canvas.winfo_reqwidth(), canvas.winfo_reqheight())
+        canvas.bind("<Configure>", lambda e: self.layout_heatmap(e.width, e.height))
+        canvas.bind("<Motion>", self.on_heatmap_hover)
+        canvas.bind("<Leave>", lambda e: self.on_heatmap_hover(None))
+        
+    def layout_heatmap(self, width, height):
+        # Near-square cells filling the canvas, columns chosen to match its aspect ratio
+        count = len(self.load_balancer.processors)
+        columns = max(1, min(count, int(np.ceil(np.sqrt(count * width / max(height, 1))))))
+        rows = -(-count // columns)
+        self.heatmap['columns'] = columns
+        self.heatmap['cell'] = max(1, min(width // columns, height // rows))
+        if self.rendered_snapshot is not None:
+            self.update_heatmap(self.rendered_snapshot)
+            
+    def update_heatmap(self, snapshot):
+        heatmap = self.heatmap
+        columns, cell = heatmap['columns'], heatmap['cell']
+        count = len(snapshot.loads)
+        rows = -(-count // columns)
+        utilisation = np.asarray(snapshot.loads) / np.asarray(snapshot.capacities)
+        pixels = np.empty((rows * columns, 3), dtype=np.uint8)
+        pixels[:count] = HEATMAP_LUT[np.clip(utilisation * 127.5, 0, 255).astype(np.intp)]
+        pixels[count:] = HEATMAP_BACKGROUND
+        pixels = pixels.reshape(rows, columns, 3).repeat(cell, axis=0).repeat(cell, axis=1)
+        header = f"P6 {columns * cell} {rows * cell} 255 ".encode()
+        heatmap['image'].configure(data=header + pixels.tobytes(), format="PPM")
+        self.show_heatmap_details(snapshot)
+        
+    def on_heatmap_hover(self, event):
+        heatmap = self.heatmap
+        heatmap['hover'] = None
+        if event is not None:
+            column, row = event.x // heatmap['cell'], event.y // heatmap['cell']
+            if column < heatmap['columns']:
+                heatmap['hover'] = row * heatmap['columns'] + column
+        if self.rendered_snapshot is not None:
+            self.show_heatmap_details(self.rendered_snapshot)
+            
+    def show_heatmap_details(self, snapshot):
+        index = self.heatmap['hover']
+        if index is None or index >= len(snapshot.loads):
+            text = "Hover over a cell for details"
+        else:
+            text = (f"Processor {index}: {snapshot.loads[index]:.1f}% load, "
+                    f"{snapshot.task_counts[index]} tasks")
+        self.heatmap['info_label'].config(text=text)
+        
+    def on_bar_resize(self, display, event):
+        display['width'] = event.width
+        display['shown_load'] = None
+        
+    def update_processor_speed(self, processor, label, var):
+        with self.load_balancer.lock:  # Speed listeners update the policy's index
+            processor.processing_speed = var.get()
+        label.config(text=f"{processor.processing_speed:.1f}x")
+        
+    def update_ui(self, snapshot):
+        # Update processor displays (the snapshot may predate a resize, so zip)
+        for display, load, capacity, task_count in zip(self.processor_displays, snapshot.loads,
+                                                       snapshot.capacities, snapshot.task_counts):
+            # Color based on load
+            if load < 60:
+                color = "#4CAF50"  # Green
+            elif load < 85:
+                color = "#FFC107"  # Yellow
+            else:
+                color = "#F44336"  # Red
+                
+            # Update load bar, only if it would visibly change
+            shown_load = display['shown_load']
+            if (shown_load is None or abs(load - shown_load) >= BAR_REDRAW_THRESHOLD
+                    or color != display['shown_color']):
+                canvas = display['canvas']
+                width = display['width']
+                canvas.coords(display['bar'], 0, 0, (load / capacity) * width, 30)
+                canvas.coords(display['bar_text'], width/2, 15)
+                canvas.itemconfig(display['bar_text'], text=f"{load:.1f}%")
+                if color != display['shown_color']:
+                    canvas.itemconfig(display['bar'], fill=color)
+                    display['shown_color'] = color
+                display['shown_load'] = load
+                
+            # Update task count
+            if task_count != display['shown_tasks']:
+                display['task_label'].config(text=f"Tasks: {task_count}")
+                display['shown_tasks'] = task_count
+            
+        if self.heatmap is not None:
+            self.update_heatmap(snapshot)
+            
+        # Update statistics
+        self.queue_label.config(text=f"Tasks in Queue: {snapshot.queued}")
+        self.completed_label.config(text=f"Completed Tasks: {snapshot.completed}")
+        
+        # Calculate average load
+        if snapshot.loads:
+            avg_load = sum(snapshot.loads) / len(snapshot.loads)
+            self.avg_load_label.config(text=f"Average Load: {avg_load:.1f}%")
+            
+        # Update graph
+        self.update_graph(snapshot)
+        
+    def graph_histories(self, snapshot):
+        # The series the graph shows, one per entry of graph_labels
+        histories = snapshot.histories
+        if self.graph_aggregate and histories:
+            # Processors added by a resize have shorter histories; use the common tail
+            depth = min(len(history) for history in histories)
+            stacked = np.vstack([history[len(history) - depth:] for history in histories])
+            histories = [stacked.mean(axis=0), stacked.max(axis=0)]
+        return histories
+        
+    def draw_lines(self, snapshot):
+        # Move each line's data in place and draw just the lines
+        for line, history in zip(self.lines, self.graph_histories(snapshot)):
+            line.set_data(self.graph_x[:len(history)], history)
+            self.ax.draw_artist(line)
+            
+    def update_graph(self, snapshot):
+        if self.chart_type == "canvas":
+            self.chart.update_series(self.graph_histories(snapshot))
+            return
+        if self.graph_background is None:
+            return  # No full draw yet; on_graph_draw will draw the lines
+        self.canvas.restore_region(self.graph_background)
+        self.draw_lines(snapshot)
+        self.canvas.blit(self.ax.bbox)
+        
+    def export_graph(self):
+        # Save the load history as currently shown; matplotlib is loaded on first use
+        snapshot = self.rendered_snapshot
+        if snapshot is None:
+            return
+        path = filedialog.asksaveasfilename(defaultextension=".png",
+                                            filetypes=[("PNG image", "*.png"), ("SVG image", "*.svg"),
+                                                       ("PDF document", "*.pdf")])
+        if not path:
+            return
+        from matplotlib.figure import Figure
+        
+        fig = Figure(figsize=(8, 4), dpi=100)
+        ax = fig.add_subplot()
+        for i, (label, history) in enumerate(zip(self.graph_labels, self.graph_histories(snapshot))):
+            ax.plot(history, label=label, color=SERIES_COLORS[i % len(SERIES_COLORS)], linewidth=2)
+        ax.set_ylim(0, 110)
+        ax.set_ylabel("Load (%)")
+        ax.set_xlabel("Time")
+        if self.graph_labels:
+            ax.legend(loc="upper right", fontsize='small')
+        ax.grid(True, linestyle='--', alpha=0.7)
+        fig.tight_layout()
+        try:
+            fig.savefig(path)
+        except (OSError, ValueError) as error:
+            messagebox.showerror("Export failed", str(error))
+            
+    def generate_tasks(self):
+        # Generate random tasks based on current settings. Runs on the
+        # simulation thread, so it reads the slider mirrors, never Tk
+        tasks = []
+        rate = self.task_rate
+        
+        # Randomly generate tasks based on rate
+        if random.random() < rate * 0.1:  # Adjust for simulation speed
+            size = max(5, min(100, random.gauss(self.task_size, 10)))
+            duration = max(1, random.gauss(self.task_duration, 2))
+            tasks.append((size, duration))
+            
+        return tasks
+        
+    def change_algorithm(self, event):
+        self.load_balancer.algorithm = self.algorithm_var.get()
+        
+    def change_processors(self, event=None):
+        try:
+            num_processors = max(1, min(MAX_PROCESSORS, int(self.processor_var.get())))
+        except tk.TclError:
+            return  # Not a number (yet)
+        self.processor_var.set(num_processors)
+        self.processor_label.config(text=str(num_processors))
+        
+        # Update processor count; tasks on removed processors are redistributed
+        self.load_balancer.resize(num_processors)
+                
+        # Update UI
+        self.update_processor_displays()
+        self.setup_graph()
+        
+    def update_task_rate_label(self, value):
+        self.task_rate = self.task_rate_var.get()
+        self.task_rate_label.config(text=f"{self.task_rate:.1f} tasks/sec")
+        
+    def update_task_size_label(self, value):
+        self.task_size = self.task_size_var.get()
+        self.task_size_label.config(text=f"{self.task_size}% CPU load")
+        
+    def update_task_duration_label(self, value):
+        self.task_duration = self.task_duration_var.get()
+        self.task_duration_label.config(text=f"{self.task_duration:.1f} seconds")
+        
+    def toggle_pause(self):
+        self.load_balancer.paused = not self.load_balancer.paused
+        self.pause_button.config(text="Resume" if self.load_balancer.paused else "Pause")
+        
+    def reset_simulation(self):
+        # Reset the simulation; the old thread stops after its current tick
+        num_processors = len(self.load_balancer.processors)
+        self.load_balancer.running = False
+        self.load_balancer = LoadBalancer(num_processors)
+        self.load_balancer.algorithm = self.algorithm_var.get()
+        self.load_balancer.paused = self.pause_button.cget("text") == "Resume"
+        self.latest_snapshot = None
+        self.rendered_snapshot = None
+        self.snapshot_requested = True
+        
+        # Update UI
+        self.update_processor_displays()
+        self.setup_graph()
+        
+        # Run the new simulation on its own thread
+        self.start_simulation()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dynamic load balancer simulation")
+    parser.add_argument("--fps", type=float, default=20, help="display refresh rate")
+    parser.add_argument("--chart", choices=["canvas", "matplotlib"], default="canvas",
+                        help="draw the load history with Tk canvas lines or matplotlib")
+    args = parser.parse_args()
+    
+    root = tk.Tk()
+    app = LoadBalancerApp(root, fps=args.fps, chart=args.chart)
+    root.mainloop()
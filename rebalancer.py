@@ -0,0 +1,151 @@
+import heapq
+from bisect import bisect_left, bisect_right
+
+PLAN_STRATEGIES = ("greedy", "min_cost")
+
+
+class Rebalancer:
+    # Periodic global rebalancing run by LoadBalancer.process_cycle every
+    # `interval` cycles. Loads are planned as they will stand until the next
+    # round: a task counts with its load scaled by the fraction of the
+    # interval it will still be running, so work about to finish isn't moved
+    # around. Each processor's fair share of that load is proportional to
+    # capacity * processing_speed, so imbalance left by early placement
+    # decisions or by speed changes both heal. Processors more than
+    # `tolerance` of their capacity above their share donate tasks to the ones
+    # furthest below theirs, most overloaded and most underloaded first, via
+    # two heaps. Moving load x between a donor `s` above its share and a
+    # receiver `d` below it reduces their squared deviation by 2x(s + d - x),
+    # so only tasks lighter than s + d are candidates. Receivers must also have
+    # room for a task's whole current load: planned load understates processors
+    # whose work is about to finish, and a move must never push one past its
+    # capacity. Migrated tasks pay `penalty` extra work units. Which task
+    # moves depends on `strategy`:
+    #   greedy   - the one with the largest reduction (load nearest (s + d) / 2)
+    #   min_cost - the one with the largest net gain: the absolute deviation
+    #              it removes minus the load the penalty adds to the receiver
+    #              over the round. Moves that don't pay for themselves before
+    #              the next round are left alone.
+    # Each donor's tasks are sorted by planned load once per round. Both scores
+    # are bounded by a function of the planned load with a single peak, so a
+    # move scans outwards from the peak and stops once neither side can beat
+    # the best task found.
+    def __init__(self, balancer, interval=10, strategy="greedy", penalty=1.0, tolerance=0.1,
+                 max_migrations=None):
+        if strategy not in PLAN_STRATEGIES:
+            raise ValueError(f"strategy must be one of {PLAN_STRATEGIES}")
+        self.balancer = balancer
+        self.interval = interval
+        self.strategy = strategy
+        self.penalty = penalty
+        self.tolerance = tolerance  # Allowed deviation from the fair share, as a fraction of capacity
+        self.max_migrations = max_migrations  # Per round, None for no limit
+        self.rounds = 0
+        self.migrations = 0
+
+    def maybe_run(self, clock):
+        if clock % self.interval == 0:
+            return self.run()
+        return 0
+
+    def _planned_load(self, task, processor):
+        # Mean load the task adds to the processor between now and the next round
+        ticks_left = task.remaining_time / processor.processing_speed
+        return task.load * min(ticks_left / self.interval, 1.0)
+
+    def _candidates(self, donor):
+        # The donor's tasks and their planned loads, ordered by planned load
+        planned = sorted(((self._planned_load(task, donor), task.id, task) for task in donor.tasks),
+                         key=lambda entry: entry[:2])
+        return [load for load, _, _ in planned], [task for _, _, task in planned]
+
+    def _pick_task(self, candidates, receiver, surplus, deficit):
+        # Index into the donor's candidates of the best task to move to the
+        # receiver, or None if no move helps
+        loads, tasks = candidates
+        gap = surplus + deficit
+        if self.strategy == "min_cost":
+            # Cost per unit of task load; planned load never exceeds task load
+            rate = self.penalty / (receiver.processing_speed * self.interval)
+            bound = lambda x: gap - abs(surplus - x) - abs(deficit - x) - rate * x
+            score = lambda i: bound(loads[i]) + rate * (loads[i] - tasks[i].load)
+            peak = min(surplus, deficit) if rate < 2 else 0
+        else:
+            bound = lambda x: x * (gap - x)
+            score = lambda i: bound(loads[i])
+            peak = gap / 2
+        # Planned load never exceeds task load, so heavier candidates can't fit
+        room = receiver.get_available_capacity()
+        end = bisect_right(loads, room)
+        best = None
+        best_score = 0
+        left = min(bisect_left(loads, peak), end) - 1
+        right = left + 1
+        while True:
+            left_bound = bound(loads[left]) if left >= 0 else best_score
+            right_bound = bound(loads[right]) if right < end else best_score
+            if max(left_bound, right_bound) <= best_score:
+                return best
+            if left_bound >= right_bound:
+                i, left = left, left - 1
+            else:
+                i, right = right, right + 1
+            if tasks[i].load <= room and score(i) > best_score:
+                best, best_score = i, score(i)
+
+    def run(self):
+        processors = self.balancer.processors
+        if len(processors) < 2:
+            return 0
+        weights = [p.capacity * p.processing_speed for p in processors]
+        total_weight = sum(weights)
+        if not total_weight:
+            return 0
+        loads = [sum(self._planned_load(task, p) for task in p.tasks) for p in processors]
+        share = sum(loads) / total_weight
+
+        # Heaps of (-surplus, id) for donors and (-deficit, id) for receivers
+        donors = []
+        receivers = []
+        for processor, weight, load in zip(processors, weights, loads):
+            surplus = load - share * weight
+            slack = self.tolerance * processor.capacity
+            if surplus > slack and processor.tasks:
+                donors.append((-surplus, processor.id))
+            elif -surplus > slack and processor.current_load < processor.capacity:
+                receivers.append((surplus, processor.id))
+        heapq.heapify(donors)
+        heapq.heapify(receivers)
+
+        candidates = {}  # Donor id -> (planned loads, tasks), built when first needed
+        moved = 0
+        limit = self.max_migrations
+        while donors and receivers and (limit is None or moved < limit):
+            surplus, donor_id = heapq.heappop(donors)
+            deficit, receiver_id = heapq.heappop(receivers)
+            surplus, deficit = -surplus, -deficit
+            donor, receiver = processors[donor_id], processors[receiver_id]
+            if donor_id not in candidates:
+                candidates[donor_id] = self._candidates(donor)
+            loads, tasks = candidates[donor_id]
+            i = self._pick_task(candidates[donor_id], receiver, surplus, deficit)
+            if i is None:
+                heapq.heappush(receivers, (-deficit, receiver_id))  # Donor has nothing suitable
+                continue
+            load, task = loads.pop(i), tasks.pop(i)
+            donor.remove_task(task)
+            task.remaining_time += self.penalty
+            receiver.add_task(task)
+            moved += 1
+            surplus -= load
+            deficit -= load
+            if surplus > self.tolerance * donor.capacity and tasks:
+                heapq.heappush(donors, (-surplus, donor_id))
+            if deficit > self.tolerance * receiver.capacity and receiver.current_load < receiver.capacity:
+                heapq.heappush(receivers, (-deficit, receiver_id))
+        self.rounds += 1
+        self.migrations += moved
+        return moved
+
+    def stats(self):
+        return {"migrations": self.migrations}
@@ -0,0 +1,479 @@
+import argparse
+import ast
+import heapq
+import inspect
+import itertools
+import random
+import time
+
+import numpy as np
+
+from arrayBackend import ArrayLoadBalancer
+from loadBalancer import LoadBalancer
+from policies import POLICIES, available_policies
+
+TICK_SECONDS = 0.1  # Simulated seconds per tick (matches the GUI's pacing)
+
+
+def make_task_generator(rate=1.0, task_size=20, task_duration=5.0, seed=None, key_space=None,
+                        priority_levels=None):
+    # Same task model as LoadBalancerApp.generate_tasks, without the Tk variables.
+    # With key_space, each task also carries a key drawn from range(key_space);
+    # with priority_levels, a priority drawn from range(priority_levels).
+    rng = random.Random(seed)
+
+    def generate_tasks():
+        tasks = []
+        if rng.random() < rate * TICK_SECONDS:
+            size = max(5, min(100, rng.gauss(task_size, 10)))
+            duration = max(1, rng.gauss(task_duration, 2))
+            if priority_levels:
+                key = rng.randrange(key_space) if key_space else None
+                tasks.append((size, duration, key, rng.randrange(priority_levels)))
+            elif key_space:
+                tasks.append((size, duration, rng.randrange(key_space)))
+            else:
+                tasks.append((size, duration))
+        return tasks
+
+    return generate_tasks
+
+
+def poisson_arrivals(rate=1.0, task_size=20, task_duration=5.0, seed=None, key_space=None):
+    # Endless stream of (arrival_tick, load, execution_time, key) for the event
+    # engine. Same size/duration/key model as make_task_generator, with
+    # exponential gaps; key is None without a key_space.
+    rng = random.Random(seed)
+    per_tick = rate * TICK_SECONDS
+    now = 0.0
+    while per_tick > 0:
+        now += rng.expovariate(per_tick)
+        size = max(5, min(100, rng.gauss(task_size, 10)))
+        duration = max(1, rng.gauss(task_duration, 2))
+        key = rng.randrange(key_space) if key_space else None
+        yield now, size, duration, key
+
+
+class SimulationResults:
+    def __init__(self, num_processors, algorithm):
+        self.num_processors = num_processors
+        self.algorithm = algorithm
+        self.ticks = 0  # Simulated time covered, in ticks (fractional for the event engine)
+        self.events = 0  # Ticks stepped or events handled
+        self.wall_seconds = 0.0
+        self.tasks_submitted = 0
+        self.tasks_completed = 0
+        self.tasks_in_flight = 0
+        self.total_response_ticks = 0.0
+        self.peak_load = 0.0  # Highest load seen on any single processor
+        # Load integrated over simulated time, per processor
+        self.processor_load_integrals = np.zeros(num_processors)
+        # Max - min processor load integrated over time (tick engine only)
+        self.imbalance_integral = None
+        # Tasks waiting in local queues (fcfs/srpt), summed over processors
+        # and integrated over time, and the longest single queue seen
+        self.local_queue_integral = 0
+        self.peak_local_queue = 0
+        self.extra_stats = {}  # Extra figures from the policy or work stealing
+
+    def track_processors(self, count):
+        # After a resize, keep accounting for every processor seen so far;
+        # removed ones simply stop accruing load
+        if count > self.num_processors:
+            integrals = np.zeros(count)
+            integrals[:self.num_processors] = self.processor_load_integrals
+            self.processor_load_integrals = integrals
+            self.num_processors = count
+
+    @property
+    def simulated_seconds(self):
+        return self.ticks * TICK_SECONDS
+
+    @property
+    def speedup(self):
+        # How much faster than real time the run was
+        if self.wall_seconds <= 0:
+            return float("inf")
+        return self.simulated_seconds / self.wall_seconds
+
+    @property
+    def mean_load(self):
+        return float(self.processor_load_integrals.sum()) / max(self.ticks, 1) / max(self.num_processors, 1)
+
+    @property
+    def mean_imbalance(self):
+        if self.imbalance_integral is None:
+            return None
+        return self.imbalance_integral / max(self.ticks, 1)
+
+    @property
+    def mean_local_queue(self):
+        # Per processor, averaged over time
+        return self.local_queue_integral / max(self.ticks, 1) / max(self.num_processors, 1)
+
+    @property
+    def mean_response_ticks(self):
+        # Average time from submission to completion, in ticks
+        if not self.tasks_completed:
+            return 0.0
+        return self.total_response_ticks / self.tasks_completed
+
+    @property
+    def processor_mean_loads(self):
+        return (self.processor_load_integrals / max(self.ticks, 1)).tolist()
+
+    def summary(self):
+        imbalance = self.mean_imbalance
+        lines = [
+            f"Algorithm:           {self.algorithm}",
+            f"Processors:          {self.num_processors}",
+            f"Simulated time:      {self.simulated_seconds:.1f}s ({self.ticks:.0f} ticks)",
+            f"Events:              {self.events}",
+            f"Wall time:           {self.wall_seconds:.3f}s ({self.speedup:.0f}x real time)",
+            f"Tasks submitted:     {self.tasks_submitted}",
+            f"Tasks completed:     {self.tasks_completed}",
+            f"Tasks in flight:     {self.tasks_in_flight}",
+            f"Mean response time:  {self.mean_response_ticks:.2f} ticks",
+            f"Average load:        {self.mean_load:.1f}%",
+            f"Peak processor load: {self.peak_load:.1f}%",
+            f"Mean imbalance:      " + (f"{imbalance:.1f}%" if imbalance is not None else "n/a"),
+        ]
+        if self.peak_local_queue:
+            lines.append(f"Mean local queue:    {self.mean_local_queue:.1f} tasks")
+            lines.append(f"Peak local queue:    {self.peak_local_queue} tasks")
+        for name, value in self.extra_stats.items():
+            label = name.replace("_", " ").capitalize() + ":"
+            lines.append(f"{label:<21}{value:.3f}" if isinstance(value, float) else f"{label:<21}{value}")
+        return "\n".join(lines)
+
+
+class HeadlessSimulation:
+    # Drives a LoadBalancer (or ArrayLoadBalancer) tick by tick as fast as the
+    # CPU allows. Nothing here imports tkinter or matplotlib. resizes maps a
+    # tick to the processor count to switch to at that tick.
+    def __init__(self, load_balancer, task_generator, resizes=None):
+        self.load_balancer = load_balancer
+        self.task_generator = task_generator
+        self.resizes = dict(resizes or {})
+
+    def run(self, ticks=None, duration=None):
+        # Run for a number of ticks or a simulated duration in seconds
+        if ticks is None:
+            ticks = int(round((duration or 0) / TICK_SECONDS))
+
+        lb = self.load_balancer
+        results = SimulationResults(len(lb.get_loads()), lb.algorithm)
+        results.imbalance_integral = 0.0
+        submitted_before = lb.task_id_counter
+        completed_before = lb.completed_tasks
+        response_before = lb.total_response_ticks
+
+        start = time.perf_counter()
+        for _ in range(ticks):
+            if lb.clock in self.resizes:
+                lb.resize(self.resizes[lb.clock])
+            lb.step(self.task_generator())
+
+            # Loads are utilisation: work waiting in local queues is counted separately
+            loads = np.asarray(lb.get_running_loads(), dtype=float)
+            if len(loads):
+                queues = lb.get_queue_lengths()
+                results.local_queue_integral += sum(queues)
+                results.peak_local_queue = max(results.peak_local_queue, max(queues))
+                high = loads.max()
+                results.imbalance_integral += high - loads.min()
+                results.peak_load = max(results.peak_load, high)
+                results.track_processors(len(loads))
+                results.processor_load_integrals[:len(loads)] += loads
+            results.ticks += 1
+            results.events += 1
+        results.wall_seconds = time.perf_counter() - start
+
+        results.tasks_submitted = lb.task_id_counter - submitted_before
+        results.tasks_completed = lb.completed_tasks - completed_before
+        results.total_response_ticks = lb.total_response_ticks - response_before
+        results.tasks_in_flight = lb.tasks_in_flight()
+        results.extra_stats = lb.extra_stats()
+        return results
+
+
+class EventDrivenSimulation:
+    # Discrete-event alternative to HeadlessSimulation. Each processor keeps a
+    # virtual clock that advances at its processing_speed, and a task finishes
+    # when that clock reaches its virtual start plus its execution time. Pending
+    # completions sit in a per-processor heap keyed by virtual finish time; a
+    # global heap holds each processor's next completion in real time, so the
+    # engine jumps straight to the next arrival or completion and idle stretches
+    # cost nothing. Time is continuous (in ticks): finish times are not rounded
+    # up to whole ticks the way the tick engine rounds them.
+    def __init__(self, load_balancer, arrivals):
+        self.load_balancer = load_balancer
+        self.arrivals = iter(arrivals)
+        self.now = 0.0
+        self._seq = itertools.count()  # Tie-breaker so tasks are never compared
+        self._completions = []  # (finish time, version, processor id)
+        num_processors = len(load_balancer.processors)
+        self._task_heaps = [[] for _ in range(num_processors)]
+        self._virtual_time = [0.0] * num_processors
+        self._last_sync = [0.0] * num_processors
+        self._version = [0] * num_processors
+        self._pending_arrival = None  # Arrival drawn but beyond the last run's end
+        self._window_start = 0.0
+
+    def _sync(self, pid):
+        # Bring a processor's virtual clock up to the current real time
+        processor = self.load_balancer.processors[pid]
+        self._virtual_time[pid] += (self.now - self._last_sync[pid]) * processor.processing_speed
+        self._last_sync[pid] = self.now
+
+    def _reschedule(self, pid):
+        # Invalidate the processor's old completion event and push the new one
+        self._version[pid] += 1
+        heap = self._task_heaps[pid]
+        if heap:
+            speed = self.load_balancer.processors[pid].processing_speed
+            finish = self.now + (heap[0][0] - self._virtual_time[pid]) / speed
+            heapq.heappush(self._completions, (finish, self._version[pid], pid))
+
+    def _next_completion(self):
+        # Drop stale events left behind by _reschedule
+        while self._completions:
+            finish, version, pid = self._completions[0]
+            if version == self._version[pid]:
+                return finish
+            heapq.heappop(self._completions)
+        return None
+
+    def set_processor_speed(self, pid, speed):
+        # Speed changes only touch the processor's own completion event
+        self._sync(pid)
+        self.load_balancer.processors[pid].processing_speed = speed
+        self._reschedule(pid)
+
+    def _arrive(self, arrival, results):
+        _, load, execution_time, *rest = arrival
+        key = rest[0] if rest else None
+        lb = self.load_balancer
+        lb.clock = self.now
+        task = lb.add_task(load, execution_time, key)
+        lb.distribute_tasks()
+
+        processor = task.processor
+        if processor is None:
+            return  # No processors: the task stays in the central queue
+        pid = processor.id
+        self._sync(pid)
+        heap = self._task_heaps[pid]
+        virtual_finish = self._virtual_time[pid] + task.remaining_time
+        heapq.heappush(heap, (virtual_finish, next(self._seq), task))
+        if heap[0][2] is task:
+            self._reschedule(pid)
+        results.peak_load = max(results.peak_load, processor.current_load)
+
+    def _complete(self, results):
+        _, _, pid = heapq.heappop(self._completions)
+        self._sync(pid)
+        processor = self.load_balancer.processors[pid]
+        heap = self._task_heaps[pid]
+        while heap and heap[0][0] <= self._virtual_time[pid] + 1e-9:
+            _, _, task = heapq.heappop(heap)
+            processor.remove_task(task)
+            task.remaining_time = 0
+            self.load_balancer.record_completion(task, self.now)
+            self._account(task, self.now, results)
+            results.total_response_ticks += self.now - task.arrival_time
+            results.tasks_completed += 1
+            self.load_balancer.release_task(task)
+        self._reschedule(pid)
+
+    def _account(self, task, until, results):
+        # Load is integrated per task over the part of the run it spent on its processor
+        since = max(task.arrival_time, self._window_start)
+        results.processor_load_integrals[task.processor.id] += task.load * (until - since)
+
+    def run(self, ticks=None, duration=None):
+        if ticks is None:
+            ticks = (duration or 0) / TICK_SECONDS
+        self._window_start = self.now
+        end = self.now + ticks
+
+        lb = self.load_balancer
+        results = SimulationResults(len(lb.processors), lb.algorithm)
+        submitted_before = lb.task_id_counter
+        next_arrival = self._pending_arrival or next(self.arrivals, None)
+
+        start = time.perf_counter()
+        while True:
+            completion = self._next_completion()
+            arrival = next_arrival[0] if next_arrival else None
+            if completion is not None and (arrival is None or completion <= arrival):
+                if completion > end:
+                    break
+                self.now = completion
+                self._complete(results)
+            elif arrival is not None and arrival <= end:
+                self.now = arrival
+                self._arrive(next_arrival, results)
+                next_arrival = next(self.arrivals, None)
+            else:
+                break
+            results.events += 1
+        self._pending_arrival = next_arrival
+        self.now = end
+        results.wall_seconds = time.perf_counter() - start
+
+        # Tasks still running contribute load up to the end of the window
+        for heap in self._task_heaps:
+            for _, _, task in heap:
+                self._account(task, end, results)
+        results.ticks = ticks
+        results.tasks_submitted = lb.task_id_counter - submitted_before
+        results.tasks_in_flight = lb.task_queue.qsize() + sum(len(heap) for heap in self._task_heaps)
+        results.extra_stats = lb.extra_stats()
+        return results
+
+
+def run_headless(num_processors=4, algorithm="round_robin", duration=3600.0,
+                 rate=1.0, task_size=20, task_duration=5.0, seed=None, engine="tick",
+                 backend="objects", policy_options=None, key_space=None, resizes=None,
+                 work_stealing=None, discipline=None, admission=None, priority_levels=None,
+                 rebalancing=None):
+    # Convenience entry point for capacity-planning runs
+    if backend == "arrays":
+        if engine == "event":
+            raise ValueError("the array backend only supports the tick engine")
+        if (policy_options or resizes or work_stealing is not None or discipline is not None
+                or admission is not None or rebalancing is not None):
+            raise ValueError("the array backend does not take policy options, resizes, work stealing, "
+                             "queueing disciplines, admission control or rebalancing")
+        load_balancer = ArrayLoadBalancer(num_processors)
+        load_balancer.algorithm = algorithm
+    else:
+        load_balancer = LoadBalancer(num_processors, discipline=discipline)
+        load_balancer.set_algorithm(algorithm, **(policy_options or {}))
+        if work_stealing is not None:
+            load_balancer.enable_work_stealing(**work_stealing)
+        if admission is not None:
+            load_balancer.enable_admission_control(**admission)
+        if rebalancing is not None:
+            load_balancer.enable_rebalancing(**rebalancing)
+    if engine == "event":
+        if (resizes or work_stealing is not None or discipline is not None or admission is not None
+                or rebalancing is not None):
+            raise ValueError("the event engine does not support resizes, work stealing, "
+                             "queueing disciplines, admission control or rebalancing")
+        if load_balancer.policy.uses_history:
+            raise ValueError(f"the event engine records no load history, which {algorithm} relies on")
+        arrivals = poisson_arrivals(rate, task_size, task_duration, seed, key_space)
+        return EventDrivenSimulation(load_balancer, arrivals).run(duration=duration)
+    generator = make_task_generator(rate, task_size, task_duration, seed, key_space, priority_levels)
+    return HeadlessSimulation(load_balancer, generator, resizes).run(duration=duration)
+
+
+def _parse_option(text):
+    # KEY=VALUE, with VALUE read as a Python literal when it is one
+    key, _, value = text.partition("=")
+    try:
+        value = ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        pass
+    return key, value
+
+
+def _policy_accepts(algorithm, key):
+    return key in inspect.signature(POLICIES[algorithm].__init__).parameters
+
+
+def _options_for(algorithm, options):
+    # Options for one algorithm out of (key, value) pairs from --option: a key
+    # scoped as policy.key applies to that policy only, a bare key to every
+    # policy that takes it
+    selected = {}
+    for key, value in options:
+        scope, _, name = key.rpartition(".")
+        if (scope or algorithm) == algorithm and _policy_accepts(algorithm, name):
+            selected[name] = value
+    return selected
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the load balancer simulation without a GUI")
+    parser.add_argument("--processors", type=int, default=4)
+    parser.add_argument("--algorithm", nargs="+", choices=available_policies(), default=["round_robin"],
+                        help="several algorithms are run one after another on the same workload")
+    parser.add_argument("--option", action="append", type=_parse_option, default=[],
+                        metavar="[POLICY.]KEY=VALUE",
+                        help="policy option, e.g. d=3; a bare key goes to every selected algorithm "
+                             "that takes it, power_of_d.d=3 to power_of_d only")
+    parser.add_argument("--duration", type=float, default=3600.0, help="simulated seconds")
+    parser.add_argument("--rate", type=float, default=1.0, help="tasks per simulated second")
+    parser.add_argument("--task-size", type=float, default=20)
+    parser.add_argument("--task-duration", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--engine", choices=["tick", "event"], default="tick")
+    parser.add_argument("--backend", choices=["objects", "arrays"], default="objects",
+                        help="arrays uses the NumPy struct-of-arrays state (tick engine only)")
+    parser.add_argument("--key-space", type=int, default=None,
+                        help="give each task an affinity key from this many distinct keys")
+    parser.add_argument("--resize", action="append", default=[], metavar="TICK=COUNT",
+                        type=lambda text: tuple(int(part) for part in text.split("=")),
+                        help="change the processor count at a tick (tick engine only)")
+    parser.add_argument("--work-stealing", choices=["random", "neighbor", "most_loaded"],
+                        default=None, help="steal work for idle processors, picking victims this way")
+    parser.add_argument("--steal-cost", type=float, default=1.0, help="extra work units per stolen task")
+    parser.add_argument("--steal-threshold", type=float, default=0.0,
+                        help="processors at or below this fraction of capacity steal")
+    parser.add_argument("--discipline", choices=["fcfs", "ps", "srpt"], default=None,
+                        help="enforce processor capacity, queueing or slowing tasks beyond it")
+    parser.add_argument("--admission", choices=["hold", "reject", "shed"], default=None,
+                        help="only dispatch tasks some processor has room for; hold, reject or "
+                             "shed the rest")
+    parser.add_argument("--queue-limit", type=int, default=None,
+                        help="most tasks waiting in the central queue under admission control")
+    parser.add_argument("--token-rate", type=float, default=None,
+                        help="admit at most this many tasks per tick (token bucket)")
+    parser.add_argument("--token-burst", type=float, default=None, help="token bucket size")
+    parser.add_argument("--priority-levels", type=int, default=None,
+                        help="give each task a priority from this many levels (used when shedding)")
+    parser.add_argument("--rebalance-every", type=int, default=None, metavar="TICKS",
+                        help="migrate tasks from overloaded to underloaded processors this often")
+    parser.add_argument("--rebalance-strategy", choices=["greedy", "min_cost"], default="greedy")
+    parser.add_argument("--migration-penalty", type=float, default=1.0,
+                        help="extra work units per migrated task")
+    parser.add_argument("--rebalance-tolerance", type=float, default=0.1,
+                        help="allowed deviation from a processor's fair share, as a fraction of capacity")
+    args = parser.parse_args()
+    for key, _ in args.option:
+        scope, _, name = key.rpartition(".")
+        if scope and scope not in args.algorithm:
+            parser.error(f"--option {key}: {scope} is not one of the selected algorithms")
+        if not any(_policy_accepts(algorithm, name) for algorithm in ([scope] if scope else args.algorithm)):
+            parser.error(f"--option {key}: no selected algorithm takes {name!r}")
+    if args.engine == "event":
+        needs_history = [name for name in args.algorithm if POLICIES[name].uses_history]
+        if needs_history:
+            parser.error(f"--engine event records no load history, which {', '.join(needs_history)} "
+                         f"relies on")
+
+    work_stealing = None
+    if args.work_stealing:
+        work_stealing = {"victim": args.work_stealing, "steal_cost": args.steal_cost,
+                         "threshold": args.steal_threshold, "seed": args.seed}
+    admission = None
+    if args.admission:
+        admission = {"overload": args.admission, "queue_limit": args.queue_limit,
+                     "rate": args.token_rate, "burst": args.token_burst}
+    rebalancing = None
+    if args.rebalance_every:
+        rebalancing = {"interval": args.rebalance_every, "strategy": args.rebalance_strategy,
+                       "penalty": args.migration_penalty, "tolerance": args.rebalance_tolerance}
+
+    for i, algorithm in enumerate(args.algorithm):
+        results = run_headless(args.processors, algorithm, args.duration,
+                               args.rate, args.task_size, args.task_duration, args.seed,
+                               args.engine, args.backend, _options_for(algorithm, args.option),
+                               args.key_space, dict(args.resize), work_stealing,
+                               args.discipline, admission, args.priority_levels, rebalancing)
+        if i:
+            print()
+        print(results.summary())
@@ -0,0 +1,76 @@
+import random
+
+from dataStructures import IndexedMinHeap
+
+VICTIM_STRATEGIES = ("random", "neighbor", "most_loaded")
+
+
+class WorkStealing:
+    # Pull-based balancing run by LoadBalancer.process_cycle. Each processor's
+    # task list is its local run queue; a processor at or below `threshold`
+    # of its capacity (0 means only idle ones) tries to steal the task at the
+    # tail of a victim's queue (Processor.last_queued). Victims must keep at
+    # least one task, and a steal only happens if it narrows the gap between
+    # the two processors.
+    # A stolen task pays steal_cost extra work units for the move.
+    def __init__(self, balancer, victim="random", steal_cost=1.0, threshold=0.0,
+                 attempts=1, seed=None):
+        if victim not in VICTIM_STRATEGIES:
+            raise ValueError(f"victim must be one of {VICTIM_STRATEGIES}")
+        self.balancer = balancer
+        self.victim = victim
+        self.steal_cost = steal_cost
+        self.threshold = threshold
+        self.attempts = attempts  # Victims tried per thief per cycle
+        self.rng = random.Random(seed)
+        self.steals = 0
+        self.rebuild()
+
+    def rebuild(self):
+        # Most-loaded victims come from a heap keyed by negated load
+        self.load_index = None
+        if self.victim == "most_loaded":
+            self.load_index = IndexedMinHeap()
+            for processor in self.balancer.processors:
+                self.load_index.push(processor.id, -processor.current_load)
+
+    def on_load_change(self, processor):
+        if self.load_index is not None and processor.id in self.load_index:
+            self.load_index.update(processor.id, -processor.current_load)
+
+    def _pick_victim(self, thief):
+        processors = self.balancer.processors
+        if self.victim == "most_loaded":
+            return processors[self.load_index.peek()]
+        if self.victim == "neighbor":
+            left = processors[(thief.id - 1) % len(processors)]
+            right = processors[(thief.id + 1) % len(processors)]
+            return left if left.current_load > right.current_load else right
+        return processors[self.rng.randrange(len(processors))]
+
+    def run(self):
+        processors = self.balancer.processors
+        if len(processors) < 2:
+            return 0
+        stolen = 0
+        for thief in processors:
+            # Checking tasks too keeps idle detection exact despite float drift in current_load
+            if thief.tasks and thief.current_load > self.threshold * thief.capacity:
+                continue
+            for _ in range(self.attempts):
+                victim = self._pick_victim(thief)
+                if victim is thief or len(victim.tasks) < 2:
+                    continue
+                task = victim.last_queued()
+                if victim.current_load - task.load < thief.current_load:
+                    continue  # Moving it would just swap the imbalance
+                victim.remove_task(task)
+                task.remaining_time += self.steal_cost
+                thief.add_task(task)
+                stolen += 1
+                break
+        self.steals += stolen
+        return stolen
+
+    def stats(self):
+        return {"steals": self.steals}